@@ -0,0 +1,33 @@
+"""
+Columnar signal store: one float32 .npy per column (memory-mappable)
+plus index.npz holding record names and int64 row offsets, so record i
+is rows offsets[i]:offsets[i + 1] of every column.
+"""
+
+import os
+import numpy as np
+
+
+def create_columns(out_dir, columns, total):
+    """Preallocate every column on disk; workers fill their own slices"""
+    os.makedirs(out_dir, exist_ok=True)
+    for name in columns:
+        np.lib.format.open_memmap(
+            os.path.join(out_dir, f"{name}.npy"), mode="w+", dtype=np.float32, shape=(total,)
+        ).flush()
+
+
+def open_column(out_dir, name, mode="r"):
+    return np.load(os.path.join(out_dir, f"{name}.npy"), mmap_mode=mode)
+
+
+def save_index(out_dir, records, offsets):
+    np.savez(os.path.join(out_dir, "index.npz"),
+             records=np.array(records), offsets=np.asarray(offsets, dtype=np.int64))
+
+
+def load_columns(out_dir, columns):
+    """Memory-mapped columns and the record index"""
+    index = np.load(os.path.join(out_dir, "index.npz"))
+    cols = {name: open_column(out_dir, name) for name in columns}
+    return cols, list(index["records"]), index["offsets"]
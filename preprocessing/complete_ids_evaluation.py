@@ -24,6 +24,8 @@ from sklearn.metrics import (
 )
 from tensorflow.keras.models import load_model
 
+from windows import load_window_index
+
 # ===========================
 # CONFIGURATION
 # ===========================
@@ -45,6 +47,7 @@ model = load_model(MODEL_PATH, compile=False)
 scaler = joblib.load(SCALER_PATH)
 df_norm = pd.read_csv(DATASET_PATH)
 data_norm = df_norm.values
+window_starts = load_window_index()   # windows that stay inside one recording
 
 print(f"✓ Model loaded")
 print(f"✓ Dataset shape: {data_norm.shape}")
@@ -141,7 +144,7 @@ attack_functions = {
 # === NORMAL SAMPLES ===
 print("Creating 500 normal windows...")
 for i in range(500):
-    start = np.random.randint(0, len(data_norm) - WINDOW_SIZE)
+    start = int(np.random.choice(window_starts))
     window = data_norm[start:start + WINDOW_SIZE]
     X_test.append(window)
     y_test.append(0)
@@ -154,7 +157,7 @@ attacks_per_type = 70
 for attack_name, attack_func in attack_functions.items():
     print(f"  Injecting {attack_name}...")
     for i in range(attacks_per_type):
-        start = np.random.randint(0, len(data_norm) - WINDOW_SIZE)
+        start = int(np.random.choice(window_starts))
         window = data_norm[start:start + WINDOW_SIZE].copy()
         attack_window = attack_func(window)
         X_test.append(attack_window)
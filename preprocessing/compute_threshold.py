@@ -1,23 +1,45 @@
+import argparse
 import numpy as np
 from tensorflow.keras.models import load_model
 
-X = np.load("medical_iot_ids/processed/X_windows.npy")
+from windows import load_normalized, load_window_index, subsample_starts, reconstruction_errors
 
-# 🔥 IMPORTANT FIX HERE
-model = load_model(
-    "medical_iot_ids/model/lstm_autoencoder.h5",
-    compile=False
-)
+STRIDE = 1          # score every STRIDE-th window
+SUBSAMPLE = 1.0     # then a random fraction of those
 
-X_pred = model.predict(X, verbose=0)
 
-errors = np.mean((X - X_pred) ** 2, axis=(1, 2))
+def threshold_stats(errors):
+    return {
+        "min": float(errors.min()),
+        "mean": float(errors.mean()),
+        "max": float(errors.max()),
+        "p95": float(np.percentile(errors, 95)),
+        "p99": float(np.percentile(errors, 99)),
+    }
 
-print("Reconstruction error stats:")
-print("Min :", errors.min())
-print("Mean:", errors.mean())
-print("Max :", errors.max())
 
-print("\nSuggested thresholds:")
-print("95% percentile:", np.percentile(errors, 95))
-print("99% percentile:", np.percentile(errors, 99))
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconstruction-error threshold")
+    parser.add_argument("--stride", type=int, default=STRIDE)
+    parser.add_argument("--subsample", type=float, default=SUBSAMPLE)
+    args = parser.parse_args()
+
+    data = load_normalized()
+    starts = subsample_starts(load_window_index(), args.stride, args.subsample)
+
+    # 🔥 IMPORTANT FIX HERE
+    model = load_model(
+        "medical_iot_ids/model/lstm_autoencoder.h5",
+        compile=False
+    )
+
+    stats = threshold_stats(reconstruction_errors(model, data, starts))
+
+    print(f"Reconstruction error stats ({len(starts)} windows):")
+    print("Min :", stats["min"])
+    print("Mean:", stats["mean"])
+    print("Max :", stats["max"])
+
+    print("\nSuggested thresholds:")
+    print("95% percentile:", stats["p95"])
+    print("99% percentile:", stats["p99"])
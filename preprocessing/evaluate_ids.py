@@ -5,6 +5,8 @@ import matplotlib.pyplot as plt
 from sklearn.metrics import confusion_matrix, classification_report, roc_curve, auc
 from tensorflow.keras.models import load_model
 
+from windows import load_window_index
+
 WINDOW_SIZE = 60
 THRESHOLD = 0.86
 
@@ -18,17 +20,18 @@ model = load_model(
 # Load normalized data
 df = pd.read_csv("medical_iot_ids/processed/final_5sensor_norm.csv")
 data = df.values
+starts = load_window_index()   # windows that stay inside one recording
 
 X = []
 y_true = []
 
 # -------- NORMAL DATA --------
-for i in range(300):
+for i in starts[:300]:
     X.append(data[i:i+WINDOW_SIZE])
     y_true.append(0)
 
 # -------- ATTACK DATA (Injected) --------
-for i in range(300, 600):
+for i in starts[300:600]:
     window = data[i:i+WINDOW_SIZE].copy()
     window[:, 0] += 3.0     # FHR spike
     window[:, 2] -= 2.0     # SpO2 drop
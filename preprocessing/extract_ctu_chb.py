@@ -1,22 +1,42 @@
-import wfdb
-import pandas as pd
 import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from columnar import create_columns, open_column, save_index
+from wfdb_native import open_record, read_header
 
 DATA_DIR = "medical_iot_ids/raw/CTU_CHB"
-rows = []
+OUT_DIR = "medical_iot_ids/processed/fhr_toco_ctu"
+COLUMNS = ["FHR", "TOCO"]
+WORKERS = os.cpu_count() or 1
+
+
+def header_length(record):
+    return read_header(os.path.join(DATA_DIR, record + ".hea"))["sig_len"]
+
 
-for file in os.listdir(DATA_DIR):
-    if file.endswith(".hea"):
-        record = file.replace(".hea", "")
-        rec = wfdb.rdrecord(os.path.join(DATA_DIR, record))
+def extract_record(job):
+    """Convert one memory-mapped record and write its columns into the store"""
+    record, start, length = job
+    rec = open_record(os.path.join(DATA_DIR, record))
+    for c, name in enumerate(COLUMNS):
+        col = open_column(OUT_DIR, name, mode="r+")
+        col[start:start + length] = rec.physical(channels=c)
+        col.flush()
+    return record
 
-        fhr = rec.p_signal[:, 0]
-        toco = rec.p_signal[:, 1]
 
-        for i in range(len(fhr)):
-            rows.append([fhr[i], toco[i]])
+if __name__ == "__main__":
+    records = sorted(f[:-4] for f in os.listdir(DATA_DIR) if f.endswith(".hea"))
+    lengths = [header_length(r) for r in records]
+    offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
 
-df = pd.DataFrame(rows, columns=["FHR", "TOCO"])
-df.to_csv("medical_iot_ids/processed/fhr_toco_ctu.csv", index=False)
+    create_columns(OUT_DIR, COLUMNS, int(offsets[-1]))
+    jobs = list(zip(records, offsets[:-1].tolist(), lengths))
+    with ProcessPoolExecutor(WORKERS) as pool:
+        for _ in pool.map(extract_record, jobs, chunksize=4):
+            pass
+    save_index(OUT_DIR, records, offsets)
 
-print("CTU-CHB extraction done")
+    print("CTU-CHB extraction done")
+    print(f"Records: {len(records)} | Samples: {offsets[-1]} | Output: {OUT_DIR}")
@@ -1,11 +1,11 @@
-import vitaldb
+from vitaldb_cache import load_case
 import pandas as pd
 import numpy as np
 
 case_id = 1
 TRACK = 'RR'
 
-data = vitaldb.load_case(case_id, [TRACK])
+data = load_case(case_id, [TRACK])
 print("Raw RR shape:", data.shape)
 
 df = pd.DataFrame(data, columns=['RespRate'])
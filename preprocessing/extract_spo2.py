@@ -1,7 +1,7 @@
-import vitaldb
+from vitaldb_cache import load_case
 import pandas as pd
 
-data = vitaldb.load_case(1, ['SPO2'])
+data = load_case(1, ['SPO2'])
 df = pd.DataFrame(data, columns=['SpO2'])
 
 df = df.dropna()
@@ -1,4 +1,4 @@
-import vitaldb
+from vitaldb_cache import load_case
 import pandas as pd
 import numpy as np
 
@@ -6,7 +6,7 @@ CASE_ID = 5          # from: "Found TEMP in case 5"
 TRACK = 'TEMP'
 
 # Load TEMP data (numpy array)
-data = vitaldb.load_case(CASE_ID, [TRACK])
+data = load_case(CASE_ID, [TRACK])
 print("Raw TEMP shape:", data.shape)
 
 # Convert to DataFrame
@@ -1,11 +1,11 @@
-import vitaldb
+from vitaldb_cache import load_case
 import pandas as pd
 import numpy as np
 
 TRACKS = ['SPO2', 'RESP', 'TEMP']
 case_id = 1
 
-data = vitaldb.load_case(case_id, TRACKS)
+data = load_case(case_id, TRACKS)
 print("Raw data shape:", data.shape)
 
 df = pd.DataFrame(data, columns=['SpO2', 'RespRate', 'Temp'])
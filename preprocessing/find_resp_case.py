@@ -1,23 +1,11 @@
-import vitaldb
-import numpy as np
+from vitaldb_cache import find_case
 
 RESP_TRACKS = ['RESP_RATE', 'RR', 'ETCO2_RESP', 'RESP']
 
-found = False
+found = find_case(RESP_TRACKS, range(1, 200))
 
-for track in RESP_TRACKS:
-    print(f"\nTrying track: {track}")
-    for case_id in range(1, 200):
-        try:
-            data = vitaldb.load_case(case_id, [track])
-            if not np.all(np.isnan(data)):
-                print(f"✅ Found {track} in case {case_id}")
-                found = True
-                break
-        except:
-            continue
-    if found:
-        break
-
-if not found:
+if found:
+    track, case_id = found
+    print(f"✅ Found {track} in case {case_id}")
+else:
     print("❌ No respiration signal found in tested cases")
@@ -0,0 +1,171 @@
+"""
+Hyperparameter search for the LSTM autoencoder with successive halving.
+
+Random configs from SEARCH_SPACE start with a small epoch budget; after
+each rung only the best 1/ETA by validation loss continue, with ETA×
+the epochs, resuming from their own checkpoints. Trials run in a local
+process pool. Each worker pins TensorFlow to THREADS_PER_WORKER threads
+and memory-maps the same normalized array, so the data is shared through
+the page cache rather than copied per trial.
+
+Every search gets a fresh run directory under SEARCH_DIR, holding the
+trial checkpoints and the results CSV (one row per trial per rung). So
+a new search never resumes an older one's checkpoints. The final table
+has each trial's last rung and can be sorted by any column.
+
+Usage:  python preprocessing/hparam_search.py [--trials 27] [--workers 4] [--threads 2] [--sort units]
+"""
+
+import os
+import csv
+import time
+import shutil
+import tempfile
+import random
+import argparse
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+SEARCH_SPACE = {
+    "units": [32, 64, 128],
+    "learning_rate": [3e-4, 1e-3, 3e-3],
+    "window": [30, 60, 90],
+    "batch_size": [32, 64, 128],
+}
+N_TRIALS = 27
+MIN_EPOCHS = 2            # budget of the first rung
+ETA = 3                   # keep the best 1/ETA, give them ETA× the epochs
+MAX_EPOCHS = 30
+WORKERS = max(1, (os.cpu_count() or 2) // 2)
+THREADS_PER_WORKER = 2
+SEARCH_DIR = "medical_iot_ids/model/hparam_search"
+RESULTS_NAME = "results.csv"
+FIELDS = ["trial", "rung", "epochs", "val_loss", "train_s"] + list(SEARCH_SPACE)
+
+
+# ======================================================
+# WORKER
+# ======================================================
+def init_worker(threads):
+    """Pin TF (and BLAS) threads before TensorFlow initializes in this process"""
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["TF_NUM_INTRAOP_THREADS"] = str(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def run_trial(trial, config, epochs, trial_dir):
+    """Train (or resume) one config up to `epochs`; return its best val_loss"""
+    from windows import load_normalized, build_window_index
+    from train_lstm import train
+
+    data = load_normalized()    # built by the parent; only memory-mapped here
+    starts = build_window_index(len(data), config["window"])
+    t0 = time.perf_counter()
+    _, history = train(
+        data, starts, window=config["window"], units=config["units"],
+        learning_rate=config["learning_rate"], batch_size=config["batch_size"],
+        epochs=epochs, checkpoint_dir=trial_dir,
+        seed=trial, verbose=0
+    )
+    val = history.history.get("val_loss") or [float("inf")]
+    return {"trial": trial, "epochs": epochs, "val_loss": float(min(val)),
+            "train_s": round(time.perf_counter() - t0, 2), **config}
+
+
+# ======================================================
+# SUCCESSIVE HALVING
+# ======================================================
+def sample_configs(n, seed):
+    rng = random.Random(seed)
+    return [{k: rng.choice(v) for k, v in SEARCH_SPACE.items()} for _ in range(n)]
+
+
+def search(n_trials, workers, threads, min_epochs, eta, max_epochs, seed=0):
+    """Run one search; returns (rows, results path)"""
+    from windows import load_normalized
+
+    # Build the shared .npy once, before any worker could race to write it
+    load_normalized()
+    # mkdtemp adds a random suffix: two searches started in the same second
+    # with the same seed still get separate directories
+    os.makedirs(SEARCH_DIR, exist_ok=True)
+    run_dir = tempfile.mkdtemp(prefix=time.strftime("%Y%m%d-%H%M%S") + f"-seed{seed}-", dir=SEARCH_DIR)
+    results_path = os.path.join(run_dir, RESULTS_NAME)
+
+    def trial_dir(t):
+        return os.path.join(run_dir, f"trial_{t:03d}")
+
+    configs = dict(enumerate(sample_configs(n_trials, seed)))
+    alive = list(configs)
+    best = {}
+    rung = 0
+    epochs = min_epochs
+
+    ctx = mp.get_context("spawn")
+    with open(results_path, "w", newline="") as f, \
+            ProcessPoolExecutor(workers, mp_context=ctx, initializer=init_worker,
+                                initargs=(threads,)) as pool:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+
+        while alive:
+            print(f"\n🔁 Rung {rung}: {len(alive)} trials × {epochs} epochs")
+            futures = [pool.submit(run_trial, t, configs[t], epochs, trial_dir(t)) for t in alive]
+            for fut in futures:
+                r = fut.result()
+                r["rung"] = rung
+                best[r["trial"]] = r
+                writer.writerow({k: r[k] for k in FIELDS})
+                f.flush()
+                print(f"  trial {r['trial']:3d} | val_loss {r['val_loss']:.6f} | {r['train_s']:.1f}s | "
+                      + " ".join(f"{k}={r[k]}" for k in SEARCH_SPACE))
+
+            if epochs >= max_epochs or len(alive) <= 1:
+                break
+            alive.sort(key=lambda t: best[t]["val_loss"])
+            keep = max(1, len(alive) // eta)
+            for t in alive[keep:]:
+                shutil.rmtree(trial_dir(t), ignore_errors=True)
+            alive = alive[:keep]
+            rung += 1
+            epochs = min(epochs * eta, max_epochs)
+
+    # Survivors of the deepest rung first, then by loss
+    return sorted(best.values(), key=lambda r: (-r["epochs"], r["val_loss"])), results_path
+
+
+def print_table(rows):
+    print("\n" + "=" * 90)
+    print(f"{'trial':>6}{'rung':>6}{'epochs':>8}{'val_loss':>12}{'train_s':>10}"
+          + "".join(f"{k:>15}" for k in SEARCH_SPACE))
+    print("-" * 90)
+    for r in rows:
+        print(f"{r['trial']:>6}{r['rung']:>6}{r['epochs']:>8}{r['val_loss']:>12.6f}{r['train_s']:>10}"
+              + "".join(f"{r[k]:>15}" for k in SEARCH_SPACE))
+    print("=" * 90)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Successive-halving search for the autoencoder")
+    parser.add_argument("--trials", type=int, default=N_TRIALS)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--threads", type=int, default=THREADS_PER_WORKER)
+    parser.add_argument("--min-epochs", type=int, default=MIN_EPOCHS)
+    parser.add_argument("--eta", type=int, default=ETA)
+    parser.add_argument("--max-epochs", type=int, default=MAX_EPOCHS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sort", choices=FIELDS, help="sort the final table by this column")
+    args = parser.parse_args()
+
+    rows, results_path = search(args.trials, args.workers, args.threads, args.min_epochs,
+                  args.eta, args.max_epochs, args.seed)
+    best = rows[0]
+    if args.sort:
+        rows = sorted(rows, key=lambda r: r[args.sort])
+    print_table(rows)
+    print(f"🏆 Best: trial {best['trial']} | val_loss {best['val_loss']:.6f} | "
+          + ", ".join(f"{k}={best[k]}" for k in SEARCH_SPACE))
+    print(f"📄 Results: {results_path}")
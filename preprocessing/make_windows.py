@@ -1,21 +1,14 @@
 import numpy as np
-import pandas as pd
 
-WINDOW_SIZE = 60
+from windows import WINDOW_SIZE, NORM_CSV, NORM_NPY, INDEX_NPY, save_normalized, build_window_index
 
-INPUT = "medical_iot_ids/processed/final_5sensor_norm.csv"
-OUTPUT = "medical_iot_ids/processed/X_windows.npy"
+# Windows are gathered by start index from this array (see windows.py);
+# only the normalized rows and one int64 per window are stored.
+data = np.loadtxt(NORM_CSV, delimiter=",", skiprows=1, ndmin=2)
+save_normalized(data, NORM_NPY)
 
-df = pd.read_csv(INPUT)
-data = df.values
+starts = build_window_index(len(data), WINDOW_SIZE)
+np.save(INDEX_NPY, starts)
 
-windows = []
-for i in range(len(data) - WINDOW_SIZE):
-    windows.append(data[i:i + WINDOW_SIZE])
-
-X = np.array(windows)
-
-np.save(OUTPUT, X)
-
-print("✅ Sliding windows created")
-print("Shape:", X.shape)
+print("✅ Window index created (no windows cross a record boundary)")
+print("Windows:", len(starts), "| rows:", len(data), "| stored:", NORM_NPY, INDEX_NPY)
@@ -1,7 +1,11 @@
+import numpy as np
 import pandas as pd
 
+from columnar import load_columns
+
 # Load all signals
-fhr_toco = pd.read_csv("medical_iot_ids/processed/fhr_toco_ctu.csv")
+cols, _, ctu_offsets = load_columns("medical_iot_ids/processed/fhr_toco_ctu", ["FHR", "TOCO"])
+fhr_toco = pd.DataFrame({name: col for name, col in cols.items()})
 spo2 = pd.read_csv("medical_iot_ids/processed/spo2.csv")
 resp = pd.read_csv("medical_iot_ids/processed/resp.csv")
 temp = pd.read_csv("medical_iot_ids/processed/temp.csv")
@@ -20,6 +24,11 @@ df.columns = ['FHR', 'TOCO', 'SpO2', 'RespRate', 'Temp']
 
 df.to_csv("medical_iot_ids/processed/final_5sensor.csv", index=False)
 
+# CTU-CHB record boundaries within the kept rows (the VitalDB columns are
+# single cases), so windowing can avoid straddling two recordings
+offsets = np.unique(np.clip(ctu_offsets, 0, min_len)).astype(np.int64)
+np.save("medical_iot_ids/processed/final_5sensor_offsets.npy", offsets)
+
 print("✅ Final 5-sensor dataset created")
 print(df.head())
-print("Shape:", df.shape)
+print("Shape:", df.shape, "| records:", len(offsets) - 1)
@@ -0,0 +1,260 @@
+"""
+Incremental preprocessing pipeline.
+
+Each stage is a script in preprocessing/ with declared inputs and
+outputs (paths from the repo root). A stage is skipped when its outputs
+exist and the SHA-256 of its inputs (the script included) matches the
+last successful run recorded in STATE_PATH. Stages depend on the stages
+producing their inputs; ready stages run in parallel as subprocesses.
+Wall time and peak RSS are reported per stage.
+
+Usage:  python preprocessing/pipeline.py [stage ...] [--force] [--jobs N] [--dry-run]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_PATH = "medical_iot_ids/.pipeline_state.json"
+JOBS = os.cpu_count() or 1
+POLL_INTERVAL = 0.05
+
+RAW = "medical_iot_ids/raw"
+PROC = "medical_iot_ids/processed"
+MODEL = "medical_iot_ids/model"
+CTU = f"{PROC}/fhr_toco_ctu"
+
+# name: (inputs, outputs); the stage's own script is always an input
+STAGES = {
+    "extract_ctu_chb": (
+        [f"{RAW}/CTU_CHB", "preprocessing/columnar.py", "preprocessing/wfdb_native.py"],
+        [f"{CTU}/FHR.npy", f"{CTU}/TOCO.npy", f"{CTU}/index.npz"],
+    ),
+    "extract_spo2": (["preprocessing/vitaldb_cache.py"], [f"{PROC}/spo2.csv"]),
+    "extract_resp": (["preprocessing/vitaldb_cache.py"], [f"{PROC}/resp.csv"]),
+    "extract_temp": (["preprocessing/vitaldb_cache.py"], [f"{PROC}/temp.csv"]),
+    "extract_vitaldb": (["preprocessing/vitaldb_cache.py"], [f"{PROC}/spo2_rr_temp.csv"]),
+    "merge_all_sensors": (
+        [f"{CTU}/FHR.npy", f"{CTU}/TOCO.npy", f"{CTU}/index.npz",
+         f"{PROC}/spo2.csv", f"{PROC}/resp.csv", f"{PROC}/temp.csv", "preprocessing/columnar.py"],
+        [f"{PROC}/final_5sensor.csv", f"{PROC}/final_5sensor_offsets.npy"],
+    ),
+    "normalize": (
+        [f"{PROC}/final_5sensor.csv"],
+        [f"{PROC}/final_5sensor_norm.csv", f"{MODEL}/scaler.pkl"],
+    ),
+    "make_windows": (
+        [f"{PROC}/final_5sensor_norm.csv", f"{PROC}/final_5sensor_offsets.npy",
+         "preprocessing/windows.py"],
+        [f"{PROC}/final_5sensor_norm.npy", f"{PROC}/final_5sensor_windows.npy"],
+    ),
+    "train_lstm": (
+        [f"{PROC}/final_5sensor_norm.npy", f"{PROC}/final_5sensor_windows.npy",
+         "preprocessing/windows.py", "preprocessing/train_data.py",
+         "preprocessing/train_callbacks.py"],
+        [f"{MODEL}/lstm_autoencoder.h5"],
+    ),
+    "compute_threshold": (
+        [f"{PROC}/final_5sensor_norm.npy", f"{PROC}/final_5sensor_windows.npy",
+         f"{MODEL}/lstm_autoencoder.h5", "preprocessing/windows.py"],
+        [],
+    ),
+}
+
+
+def script_path(stage):
+    return f"preprocessing/{stage}.py"
+
+
+def stage_inputs(stage):
+    return [script_path(stage)] + STAGES[stage][0]
+
+
+def upstream(stage):
+    """Stages producing any of this stage's inputs"""
+    inputs = set(stage_inputs(stage))
+    return {s for s, (_, outs) in STAGES.items() if s != stage and inputs & set(outs)}
+
+
+# ======================================================
+# HASHING
+# ======================================================
+class Hasher:
+    """
+    SHA-256 of files and directories. File digests are remembered by
+    (size, mtime) so unchanged large inputs are not re-read on every run.
+    """
+
+    def __init__(self, memo):
+        self.memo = memo
+
+    def file(self, path):
+        st = os.stat(path)
+        stamp = [st.st_size, st.st_mtime_ns]
+        entry = self.memo.get(path)
+        if entry and entry[0] == stamp:
+            return entry[1]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        self.memo[path] = [stamp, digest]
+        return digest
+
+    def path(self, path):
+        if not os.path.isdir(path):
+            return self.file(path) if os.path.exists(path) else "missing"
+        h = hashlib.sha256()
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+            for name in sorted(filenames):
+                p = os.path.join(dirpath, name)
+                h.update(os.path.relpath(p, path).encode() + b"\0" + self.file(p).encode())
+        return h.hexdigest()
+
+    def inputs(self, stage):
+        h = hashlib.sha256()
+        for p in stage_inputs(stage):
+            h.update(p.encode() + b"\0" + self.path(p).encode())
+        return h.hexdigest()
+
+
+# ======================================================
+# RUNNER
+# ======================================================
+def peak_rss_mb(rusage):
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return round(rusage.ru_maxrss * scale / 2 ** 20, 1)
+
+
+def save_state(state):
+    """Write STATE_PATH atomically, so an interrupted run keeps the last good state"""
+    os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+    tmp = STATE_PATH + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp, STATE_PATH)
+
+
+def run_stages(targets, force=False, jobs=JOBS, dry_run=False):
+    if jobs < 1:
+        raise ValueError(f"jobs must be at least 1, got {jobs}")
+    state = {"stages": {}, "hashes": {}}
+    if os.path.exists(STATE_PATH):
+        with open(STATE_PATH) as f:
+            state = json.load(f)
+    hasher = Hasher(state["hashes"])
+
+    # Targets plus everything upstream of them
+    todo = set()
+    stack = list(targets)
+    while stack:
+        s = stack.pop()
+        if s not in todo:
+            todo.add(s)
+            stack.extend(upstream(s))
+
+    done = set()          # finished (run or skipped) this session
+    failed = set()
+    running = {}          # stage → (Popen, start, input digest)
+    report = []
+
+    def stale(stage, digest):
+        outputs = STAGES[stage][1]
+        return ((force and stage in targets) or state["stages"].get(stage) != digest
+                or not all(os.path.exists(o) for o in outputs))
+
+    while todo or running:
+        # ---------- LAUNCH READY STAGES ----------
+        for stage in sorted(todo):
+            deps = upstream(stage)
+            if deps & failed:
+                todo.discard(stage)
+                failed.add(stage)
+                report.append((stage, "skipped (upstream failed)", None, None))
+                continue
+            if not deps <= done or len(running) >= jobs:
+                continue
+            todo.discard(stage)
+            digest = hasher.inputs(stage)
+            if not stale(stage, digest):
+                done.add(stage)
+                report.append((stage, "up to date", None, None))
+                continue
+            if dry_run:
+                done.add(stage)
+                report.append((stage, "would run", None, None))
+                continue
+            print(f"▶ {stage}")
+            proc = subprocess.Popen([sys.executable, script_path(stage)])
+            running[stage] = (proc, time.monotonic(), digest)
+
+        # ---------- REAP FINISHED STAGES ----------
+        for stage, (proc, start, digest) in list(running.items()):
+            if hasattr(os, "wait4"):
+                pid, status, rusage = os.wait4(proc.pid, os.WNOHANG)
+                if pid == 0:
+                    continue
+                proc.returncode = os.waitstatus_to_exitcode(status) \
+                    if hasattr(os, "waitstatus_to_exitcode") else (status >> 8)
+                peak = peak_rss_mb(rusage)
+            else:
+                if proc.poll() is None:
+                    continue
+                peak = None
+
+            del running[stage]
+            elapsed = time.monotonic() - start
+            if proc.returncode == 0:
+                done.add(stage)
+                state["stages"][stage] = digest
+                save_state(state)     # a later crash or Ctrl+C must not re-run this stage
+                report.append((stage, "ran", elapsed, peak))
+            else:
+                failed.add(stage)
+                report.append((stage, f"failed (exit {proc.returncode})", elapsed, peak))
+
+        if running:
+            time.sleep(POLL_INTERVAL)
+
+    if not dry_run:
+        save_state(state)     # also keeps the hash memo of up-to-date stages
+    return report, failed
+
+
+def print_report(report):
+    print("\n" + "=" * 70)
+    print(f"{'Stage':22}{'Status':28}{'Wall (s)':>10}{'Peak MB':>10}")
+    print("-" * 70)
+    for stage, status, elapsed, peak in report:
+        wall = f"{elapsed:.2f}" if elapsed is not None else "-"
+        mem = f"{peak:.1f}" if peak is not None else "-"
+        print(f"{stage:22}{status:28}{wall:>10}{mem:>10}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental preprocessing pipeline")
+    parser.add_argument("stages", nargs="*", help=f"targets (default: all) from {', '.join(STAGES)}")
+    parser.add_argument("--force", action="store_true", help="run targets even if up to date")
+    parser.add_argument("--jobs", type=int, default=JOBS)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    unknown = set(args.stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    os.chdir(ROOT)
+    report, failed = run_stages(args.stages or list(STAGES), args.force, args.jobs, args.dry_run)
+    print_report(report)
+    sys.exit(1 if failed else 0)
@@ -14,6 +14,8 @@ from sklearn.metrics import (
 )
 from tensorflow.keras.models import load_model
 
+from windows import load_window_index
+
 # ===========================
 # CONFIGURATION
 # ===========================
@@ -35,6 +37,7 @@ model = load_model(MODEL_PATH, compile=False)
 scaler = joblib.load(SCALER_PATH)
 df_norm = pd.read_csv(DATASET_PATH)
 data_norm = df_norm.values
+window_starts = load_window_index()   # windows that stay inside one recording
 
 print(f"✓ Model loaded")
 print(f"✓ Dataset shape: {data_norm.shape}")
@@ -141,7 +144,7 @@ attack_functions = {
 print("Creating 500 normal windows...")
 for i in range(500):
     # Random starting point
-    start = np.random.randint(0, len(data_norm) - WINDOW_SIZE)
+    start = int(np.random.choice(window_starts))
     window = data_norm[start:start + WINDOW_SIZE]
     X_test.append(window)
     y_test.append(0)  # 0 = Normal
@@ -155,7 +158,7 @@ for attack_name, attack_func in attack_functions.items():
     print(f"  Injecting {attack_name}...")
     for i in range(attacks_per_type):
         # Start with normal window
-        start = np.random.randint(0, len(data_norm) - WINDOW_SIZE)
+        start = int(np.random.choice(window_starts))
         window = data_norm[start:start + WINDOW_SIZE].copy()
 
         # Inject attack
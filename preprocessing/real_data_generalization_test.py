@@ -1,28 +1,19 @@
-import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 from tensorflow.keras.models import load_model
 
-WINDOW_SIZE = 60
+from windows import WINDOW_SIZE, load_normalized, load_window_index, reconstruction_errors
 
-# Load normalized real data
-df = pd.read_csv("medical_iot_ids/processed/final_5sensor_norm.csv")
-data = df.values
-
-# Create windows
-windows = []
-for i in range(len(data) - WINDOW_SIZE):
-    windows.append(data[i:i+WINDOW_SIZE])
-
-X = np.array(windows)
+# Load normalized real data and its window-start index
+data = load_normalized()
+starts = load_window_index()
 
 # Train/Test split (70/30)
-split_idx = int(0.7 * len(X))
-X_train = X[:split_idx]
-X_test = X[split_idx:]
+split_idx = int(0.7 * len(starts))
+train_starts = starts[:split_idx]
+test_starts = starts[split_idx:]
 
-print("Train windows:", X_train.shape)
-print("Test windows :", X_test.shape)
+print("Train windows:", (len(train_starts), WINDOW_SIZE, data.shape[1]))
+print("Test windows :", (len(test_starts), WINDOW_SIZE, data.shape[1]))
 
 # Load trained model
 model = load_model(
@@ -31,12 +22,8 @@ model = load_model(
 )
 
 # Reconstruction errors
-def reconstruction_error(X):
-    X_pred = model.predict(X, verbose=0)
-    return np.mean((X - X_pred) ** 2, axis=(1,2))
-
-train_errors = reconstruction_error(X_train)
-test_errors = reconstruction_error(X_test)
+train_errors = reconstruction_errors(model, data, train_starts)
+test_errors = reconstruction_errors(model, data, test_starts)
 
 # Stats
 print("\nTrain Error Stats")
@@ -0,0 +1,110 @@
+"""
+How much do window stride and subsampling cost in model and threshold
+quality? For each stride:
+  1. train a fresh autoencoder on every stride-th training window and
+     report wall time, best val_loss (on the full validation range) and
+     the p95/p99 threshold it yields on that validation range;
+  2. with the smallest-stride model, estimate the threshold from every
+     stride-th window at each phase offset and report the spread of the
+     estimates (threshold stability) against scoring time.
+
+Usage:  python preprocessing/stride_experiment.py [--strides 1,2,5,10,20,60] [--epochs 10]
+"""
+
+import json
+import time
+import argparse
+import numpy as np
+
+from windows import load_normalized, load_window_index, reconstruction_errors
+from train_data import split_starts
+from train_lstm import train
+from compute_threshold import threshold_stats
+
+STRIDES = [1, 2, 5, 10, 20, 60]
+EXPERIMENT_EPOCHS = 10
+MAX_PHASES = 5              # phase offsets tried per stride in part 2
+REPORT_PATH = "medical_iot_ids/model/stride_experiment.json"
+
+
+def training_cost(data, starts, strides, epochs):
+    _, val_starts = split_starts(starts)
+    rows = []
+    models = {}
+    for stride in strides:
+        t0 = time.perf_counter()
+        model, history = train(data, starts, stride=stride, epochs=epochs, seed=0, verbose=0)
+        wall = time.perf_counter() - t0
+        stats = threshold_stats(reconstruction_errors(model, data, val_starts))
+        rows.append({
+            "stride": stride,
+            "train_windows": len(split_starts(starts)[0][::stride]),
+            "epochs_run": len(history.history["loss"]),
+            "train_s": round(wall, 2),
+            "best_val_loss": round(min(history.history["val_loss"]), 6),
+            "p95": round(stats["p95"], 6),
+            "p99": round(stats["p99"], 6),
+        })
+        models[stride] = model
+        print(f"  stride {stride:3d}: {wall:7.1f}s | val_loss {rows[-1]['best_val_loss']:.6f} "
+              f"| p99 {rows[-1]['p99']:.6f}")
+    base = rows[0]
+    for r in rows:
+        r["speedup"] = round(base["train_s"] / r["train_s"], 2)
+        r["p99_change"] = round(r["p99"] / base["p99"] - 1, 4)
+    return rows, models[strides[0]]
+
+
+def threshold_stability(model, data, starts, strides):
+    t0 = time.perf_counter()
+    errors = reconstruction_errors(model, data, starts)
+    full_s = time.perf_counter() - t0
+    full = threshold_stats(errors)
+
+    rows = []
+    for stride in strides:
+        phases = range(min(stride, MAX_PHASES))
+        p95 = np.array([np.percentile(errors[p::stride], 95) for p in phases])
+        p99 = np.array([np.percentile(errors[p::stride], 99) for p in phases])
+        rows.append({
+            "stride": stride,
+            "windows_scored": len(errors[::stride]),
+            "est_score_s": round(full_s / stride, 2),
+            "p95_mean": round(float(p95.mean()), 6),
+            "p95_rel_std": round(float(p95.std() / full["p95"]), 4),
+            "p99_mean": round(float(p99.mean()), 6),
+            "p99_rel_std": round(float(p99.std() / full["p99"]), 4),
+            "p99_max_rel_err": round(float(np.abs(p99 / full["p99"] - 1).max()), 4),
+        })
+    return rows
+
+
+def print_table(title, rows):
+    print(f"\n{title}")
+    cols = list(rows[0])
+    print("  ".join(f"{c:>15}" for c in cols))
+    for r in rows:
+        print("  ".join(f"{r[c]:>15}" for c in cols))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Window stride experiment")
+    parser.add_argument("--strides", default=",".join(map(str, STRIDES)))
+    parser.add_argument("--epochs", type=int, default=EXPERIMENT_EPOCHS)
+    args = parser.parse_args()
+    strides = sorted(int(s) for s in args.strides.split(","))
+
+    data = load_normalized()
+    starts = load_window_index()
+
+    print("🧪 Part 1: training cost vs stride")
+    training, base_model = training_cost(data, starts, strides, args.epochs)
+    print("🧪 Part 2: threshold stability vs scoring stride")
+    stability = threshold_stability(base_model, data, starts, strides)
+
+    print_table("TRAINING (validation range is never strided)", training)
+    print_table("THRESHOLD ESTIMATION (smallest-stride model)", stability)
+
+    with open(REPORT_PATH, "w") as f:
+        json.dump({"epochs": args.epochs, "training": training, "threshold": stability}, f, indent=2)
+    print(f"\n📄 Report: {REPORT_PATH}")
@@ -0,0 +1,58 @@
+"""
+Training checkpoints and throughput logging for train_lstm.py.
+"""
+
+import os
+import re
+import json
+import time
+import platform
+from tensorflow.keras.callbacks import Callback
+
+CHECKPOINT_PATTERN = "epoch_{epoch:03d}.h5"
+BEST_CHECKPOINT = "best.h5"         # lowest val_loss so far, across resumes
+_CHECKPOINT_RE = re.compile(r"^epoch_(\d+)\.h5$")
+
+
+def latest_checkpoint(checkpoint_dir):
+    """(path, epoch) of the newest epoch checkpoint, or (None, 0)"""
+    if not os.path.isdir(checkpoint_dir):
+        return None, 0
+    found = [(int(m.group(1)), name) for name in os.listdir(checkpoint_dir)
+             for m in [_CHECKPOINT_RE.match(name)] if m]
+    if not found:
+        return None, 0
+    epoch, name = max(found)
+    return os.path.join(checkpoint_dir, name), epoch
+
+
+class ThroughputLogger(Callback):
+    """
+    Appends one JSON line per epoch to `path`: wall time, training
+    samples/second and the epoch's logs (loss, val_loss), tagged with the
+    host and run config so runs on different machines can be compared.
+    """
+
+    def __init__(self, path, n_samples, config=None):
+        super().__init__()
+        self.path = path
+        self.n_samples = n_samples
+        self.config = dict(config or {}, host=platform.node(), cpus=os.cpu_count())
+        self.t0 = None
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.t0 = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        wall = time.perf_counter() - self.t0
+        record = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "epoch": epoch + 1,
+            "wall_s": round(wall, 3),
+            "samples_per_s": round(self.n_samples / wall, 1),
+            **{k: float(v) for k, v in (logs or {}).items()},
+            "config": self.config,
+        }
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"⏱️ epoch {epoch + 1}: {wall:.1f}s | {record['samples_per_s']:.0f} samples/s")
@@ -0,0 +1,42 @@
+"""
+Streaming tf.data input for the LSTM autoencoder.
+
+Only int64 window start indices go through the pipeline: they are
+shuffled (a fresh permutation each epoch), batched, and each batch is
+gathered from the memory-mapped normalized array on a CPU thread pool,
+then prefetched. Memory stays at a few batches regardless of corpus size.
+"""
+
+import numpy as np
+import tensorflow as tf
+
+from windows import WINDOW_SIZE, gather_windows
+
+VALIDATION_SPLIT = 0.1
+AUTOTUNE = tf.data.experimental.AUTOTUNE
+
+
+def split_starts(starts, validation=VALIDATION_SPLIT):
+    """Train / validation starts by index range (the last `validation` share)"""
+    split = int(len(starts) * (1 - validation))
+    return starts[:split], starts[split:]
+
+
+def make_dataset(data, starts, window=WINDOW_SIZE, batch_size=32, shuffle=True, seed=None):
+    """(x, x) batches of windows gathered from `data` at `starts`"""
+    features = data.shape[1]
+
+    def gather(batch_starts):
+        return gather_windows(data, batch_starts, window)
+
+    def load(batch_starts):
+        x = tf.numpy_function(gather, [batch_starts], tf.float32)
+        x.set_shape([None, window, features])
+        return x, x
+
+    ds = tf.data.Dataset.from_tensor_slices(np.asarray(starts, dtype=np.int64))
+    if shuffle:
+        ds = ds.shuffle(len(starts), seed=seed, reshuffle_each_iteration=True)
+    return (ds.batch(batch_size)
+              .map(load, num_parallel_calls=AUTOTUNE)
+              .prefetch(AUTOTUNE))
@@ -1,47 +1,119 @@
-import numpy as np
 import os
-from tensorflow.keras.models import Sequential
+import argparse
+from tensorflow.keras.models import Sequential, load_model
 from tensorflow.keras.layers import LSTM, Dense, RepeatVector, TimeDistributed
 from tensorflow.keras.optimizers import Adam
+from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping
+
+from windows import WINDOW_SIZE, load_normalized, load_window_index, subsample_starts
+from train_data import split_starts, make_dataset
+from train_callbacks import CHECKPOINT_PATTERN, BEST_CHECKPOINT, latest_checkpoint, ThroughputLogger
 
 # Paths
-DATA_PATH = "medical_iot_ids/processed/X_windows.npy"
 MODEL_DIR = "medical_iot_ids/model"
 MODEL_PATH = os.path.join(MODEL_DIR, "lstm_autoencoder.h5")
+CHECKPOINT_DIR = os.path.join(MODEL_DIR, "checkpoints")
+METRICS_PATH = os.path.join(MODEL_DIR, "train_metrics.jsonl")
+
+UNITS = 64
+LEARNING_RATE = 0.001
+BATCH_SIZE = 32
+EPOCHS = 30               # upper bound; early stopping usually ends sooner
+PATIENCE = 5              # epochs without val_loss improvement
+STRIDE = 1                # keep every STRIDE-th training window
+SUBSAMPLE = 1.0           # then a random fraction of those
+
+
+def build_model(window, features, units=UNITS, learning_rate=LEARNING_RATE):
+    """LSTM Autoencoder"""
+    model = Sequential([
+        LSTM(units, activation="tanh", input_shape=(window, features)),
+        RepeatVector(window),
+        LSTM(units, activation="tanh", return_sequences=True),
+        TimeDistributed(Dense(features))
+    ])
+
+    model.compile(
+        optimizer=Adam(learning_rate=learning_rate),
+        loss="mse"
+    )
+    return model
+
+
+def train(data, starts, window=WINDOW_SIZE, units=UNITS, learning_rate=LEARNING_RATE,
+          batch_size=BATCH_SIZE, epochs=EPOCHS, stride=STRIDE, subsample=SUBSAMPLE,
+          checkpoint_dir=None, metrics_path=None, callbacks=(), seed=None, verbose=1):
+    """
+    Train on windows gathered from `data` at `starts`. Validation is the
+    last 10% of starts and is never strided or subsampled, so val_loss is
+    comparable across settings. With checkpoint_dir, every epoch is saved
+    and training resumes from the newest checkpoint; the best epoch is
+    kept separately and is the model returned, even across resumes.
+    """
+    train_starts, val_starts = split_starts(starts)
+    train_starts = subsample_starts(train_starts, stride, subsample, seed)
+    if verbose:
+        print("Windows: train", len(train_starts), "| validation", len(val_starts))
+
+    train_ds = make_dataset(data, train_starts, window, batch_size, shuffle=True, seed=seed)
+    val_ds = make_dataset(data, val_starts, window, batch_size, shuffle=False)
+
+    # Resume from the latest epoch checkpoint (model + optimizer state).
+    # Early stopping's best-so-far restarts from the resumed epoch.
+    checkpoint, initial_epoch = latest_checkpoint(checkpoint_dir) if checkpoint_dir else (None, 0)
+    if checkpoint:
+        model = load_model(checkpoint)
+        print(f"↻ Resuming from {checkpoint} (epoch {initial_epoch})")
+    else:
+        model = build_model(window, data.shape[1], units, learning_rate)
+
+    callbacks = [EarlyStopping(monitor="val_loss", patience=PATIENCE, restore_best_weights=True)] \
+        + list(callbacks)
+    best_path = None
+    if checkpoint_dir:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        best_path = os.path.join(checkpoint_dir, BEST_CHECKPOINT)
+        best = ModelCheckpoint(best_path, monitor="val_loss", save_best_only=True)
+        if checkpoint and os.path.exists(best_path):
+            # Early stopping forgets the pre-resume best; this one must not
+            best.best = load_model(best_path).evaluate(val_ds, verbose=0)
+        callbacks += [ModelCheckpoint(os.path.join(checkpoint_dir, CHECKPOINT_PATTERN)), best]
+    if metrics_path:
+        callbacks.append(ThroughputLogger(metrics_path, len(train_starts), {
+            "batch_size": batch_size, "window": window, "units": units,
+            "learning_rate": learning_rate, "stride": stride, "subsample": subsample,
+        }))
+
+    history = model.fit(
+        train_ds,
+        epochs=epochs,
+        initial_epoch=initial_epoch,
+        validation_data=val_ds,
+        callbacks=callbacks,
+        verbose=verbose
+    )
+    if best_path and os.path.exists(best_path):
+        model = load_model(best_path)
+    return model, history
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the LSTM autoencoder")
+    parser.add_argument("--stride", type=int, default=STRIDE)
+    parser.add_argument("--subsample", type=float, default=SUBSAMPLE)
+    args = parser.parse_args()
+
+    # Windows are gathered on the fly from the memory-mapped normalized array,
+    # through the start index (no window crosses a record boundary)
+    data = load_normalized()
+    model, history = train(data, load_window_index(), stride=args.stride, subsample=args.subsample,
+                           checkpoint_dir=CHECKPOINT_DIR, metrics_path=METRICS_PATH)
+    model.summary()
+
+    # Save model (the best epoch, including any before a resume)
+    model.save(MODEL_PATH)
 
-os.makedirs(MODEL_DIR, exist_ok=True)
-
-# Load data
-X = np.load(DATA_PATH)
-print("Loaded data shape:", X.shape)
-
-TIMESTEPS = X.shape[1]   # 60
-FEATURES = X.shape[2]    # 5
-
-# Build LSTM Autoencoder
-model = Sequential([
-    LSTM(64, activation="tanh", input_shape=(TIMESTEPS, FEATURES)),
-    RepeatVector(TIMESTEPS),
-    LSTM(64, activation="tanh", return_sequences=True),
-    TimeDistributed(Dense(FEATURES))
-])
-
-model.compile(
-    optimizer=Adam(learning_rate=0.001),
-    loss="mse"
-)
-
-model.summary()
-
-# Train
-history = model.fit(
-    X, X,
-    epochs=30,
-    batch_size=32,
-    validation_split=0.1,
-    shuffle=True
-)
-
-# Save model
-model.save(MODEL_PATH)
-print("✅ LSTM Autoencoder trained and saved")
+    # Finished runs start fresh next time; only interrupted runs resume
+    for name in os.listdir(CHECKPOINT_DIR):
+        os.remove(os.path.join(CHECKPOINT_DIR, name))
+    print("✅ LSTM Autoencoder trained and saved")
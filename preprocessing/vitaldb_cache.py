@@ -0,0 +1,155 @@
+"""
+Offline VitalDB case cache.
+
+Loaders share one interface, load(case_id, tracks, interval) → float array
+(samples, len(tracks)) or None when the case has none of the tracks:
+  RemoteLoader    vitaldb.load_case (network)
+  LocalDirLoader  a local directory standing in for the remote source:
+                  <root>/<case_id>/<TRACK>.npy, one 1-D array per track
+  CachedLoader    wraps either one with a content-addressed disk cache
+
+The cache stores each array once as compressed npz under its SHA-256
+(blobs/ab/abcd….npz); refs/ maps a request (source, case, tracks,
+interval) to that hash. Files are written via rename, so a pool of
+workers can fill the cache concurrently. Re-runs read only the cache and
+work offline.
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+CACHE_DIR = "medical_iot_ids/cache/vitaldb"
+LOCAL_DIR = None          # set to a directory to stand in for the remote source
+SCAN_WORKERS = 8          # case probes are network-bound
+MISSING = "missing"
+
+
+def _atomic_write(path, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+# ======================================================
+# LOADERS
+# ======================================================
+class RemoteLoader:
+    name = "vitaldb"
+
+    def load(self, case_id, tracks, interval=1):
+        import vitaldb
+        data = vitaldb.load_case(case_id, list(tracks), interval)
+        if data is None or len(data) == 0:
+            return None
+        return np.asarray(data, dtype=np.float32)
+
+
+class LocalDirLoader:
+    def __init__(self, root):
+        self.root = root
+        self.name = f"local:{os.path.abspath(root)}"
+
+    def load(self, case_id, tracks, interval=1):
+        columns = []
+        for track in tracks:
+            path = os.path.join(self.root, str(case_id), f"{track}.npy")
+            columns.append(np.load(path).astype(np.float32) if os.path.exists(path) else None)
+        if all(c is None for c in columns):
+            return None
+        n = max(len(c) for c in columns if c is not None)
+        out = np.full((n, len(tracks)), np.nan, dtype=np.float32)
+        for i, c in enumerate(columns):
+            if c is not None:
+                out[:len(c), i] = c
+        return out[::int(interval)] if interval != 1 else out
+
+
+class CachedLoader:
+    def __init__(self, source, cache_dir=CACHE_DIR):
+        self.source = source
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    def _ref_path(self, case_id, tracks, interval):
+        request = json.dumps([self.source.name, case_id, list(tracks), interval])
+        key = hashlib.sha256(request.encode()).hexdigest()
+        return os.path.join(self.cache_dir, "refs", key[:2], key)
+
+    def _blob_path(self, digest):
+        return os.path.join(self.cache_dir, "blobs", digest[:2], digest + ".npz")
+
+    def load(self, case_id, tracks, interval=1):
+        ref = self._ref_path(case_id, tracks, interval)
+        if os.path.exists(ref):
+            with open(ref) as f:
+                digest = f.read().strip()
+            self.hits += 1
+            if digest == MISSING:
+                return None
+            with np.load(self._blob_path(digest)) as z:
+                return z["data"]
+
+        self.misses += 1
+        data = self.source.load(case_id, tracks, interval)
+        if data is None:
+            digest = MISSING
+        else:
+            data = np.ascontiguousarray(data, dtype=np.float32)
+            digest = hashlib.sha256(data.tobytes() + str(data.shape).encode()).hexdigest()
+            blob = self._blob_path(digest)
+            if not os.path.exists(blob):
+                _atomic_write(blob, lambda f: np.savez_compressed(f, data=data))
+        _atomic_write(ref, lambda f: f.write(digest.encode()))
+        return data
+
+
+def default_loader():
+    source = LocalDirLoader(LOCAL_DIR) if LOCAL_DIR else RemoteLoader()
+    return CachedLoader(source)
+
+
+def load_case(case_id, tracks, interval=1):
+    """Drop-in for vitaldb.load_case going through the default cache"""
+    return default_loader().load(case_id, tracks, interval)
+
+
+# ======================================================
+# CASE SCAN
+# ======================================================
+def has_signal(loader, case_id, track):
+    try:
+        data = loader.load(case_id, [track])
+    except Exception as e:
+        print(f"⚠️ case {case_id} / {track}: {e}")
+        return False
+    return data is not None and not np.all(np.isnan(data))
+
+
+def find_case(tracks, case_ids, loader=None, workers=SCAN_WORKERS):
+    """
+    First (track, case_id) with a non-empty signal, trying tracks in order
+    and probing the cases of each track `workers` at a time.
+    """
+    loader = loader or default_loader()
+    case_ids = list(case_ids)
+    with ThreadPoolExecutor(workers) as pool:
+        for track in tracks:
+            print(f"\nTrying track: {track}")
+            for i in range(0, len(case_ids), workers):
+                chunk = case_ids[i:i + workers]
+                found = pool.map(lambda c: has_signal(loader, c, track), chunk)
+                for case_id, ok in zip(chunk, found):
+                    if ok:
+                        return track, case_id
+    return None
@@ -0,0 +1,89 @@
+"""
+Minimal WFDB reader for CTU-CHB style records (format 16, all signals
+interleaved in one .dat). The .dat is exposed as a zero-copy np.memmap of
+raw int16 samples; conversion to physical units happens per slice, so
+scanning the corpus costs page-cache reads instead of a full float64
+decode of every record.
+"""
+
+import os
+import re
+import numpy as np
+
+INVALID_SAMPLE = -32768       # WFDB "no value" for format 16
+SUPPORTED_FORMATS = {"16": "<i2"}
+
+_GAIN = re.compile(r"^([0-9.eE+-]+)?(?:\(([-0-9]+)\))?(?:/(.*))?$")
+
+
+def read_header(path):
+    """Parse a .hea file into record and per-signal fields"""
+    with open(path) as f:
+        lines = [ln.strip() for ln in f if ln.strip() and not ln.startswith("#")]
+
+    name, n_sig, fs, sig_len = lines[0].split()[:4]
+    n_sig = int(n_sig)
+    signals = []
+    for line in lines[1:1 + n_sig]:
+        fields = line.split()
+        # Kept whole: "16x2" (samples per frame), "16:..." (skew) or
+        # "16+512" (byte offset) change the layout and are not plain 16
+        fmt = fields[1]
+        gain, baseline, units = _GAIN.match(fields[2]).groups() if len(fields) > 2 else (None, None, None)
+        adc_zero = int(fields[4]) if len(fields) > 4 else 0
+        gain = float(gain) if gain and float(gain) != 0 else 200.0   # WFDB default gain
+        signals.append({
+            "file": fields[0],
+            "fmt": fmt,
+            "gain": gain,
+            "baseline": int(baseline) if baseline is not None else adc_zero,
+            "units": units or "mV",
+            "name": fields[8] if len(fields) > 8 else "",
+        })
+
+    return {"name": name, "n_sig": n_sig, "fs": float(fs.split("/")[0]),
+            "sig_len": int(sig_len), "signals": signals}
+
+
+class Record:
+    """One record: raw int16 memmap plus lazy physical-unit slices"""
+
+    def __init__(self, path):
+        base = path[:-4] if path.endswith((".hea", ".dat")) else path
+        self.header = read_header(base + ".hea")
+        signals = self.header["signals"]
+        files = {s["file"] for s in signals}
+        fmts = {s["fmt"] for s in signals}
+        if len(files) != 1 or not fmts <= set(SUPPORTED_FORMATS):
+            raise ValueError(f"{base}: only single-file format 16 records are supported "
+                             f"(got format {', '.join(sorted(fmts))} in {len(files)} file(s))")
+
+        self.name = self.header["name"]
+        self.fs = self.header["fs"]
+        self.sig_len = self.header["sig_len"]
+        self.sig_names = [s["name"] for s in signals]
+        self.units = [s["units"] for s in signals]
+        self.gain = np.array([s["gain"] for s in signals], dtype=np.float32)
+        self.baseline = np.array([s["baseline"] for s in signals], dtype=np.float32)
+
+        dat = os.path.join(os.path.dirname(base), files.pop())
+        self.raw = np.memmap(dat, dtype=SUPPORTED_FORMATS[fmts.pop()], mode="r",
+                             shape=(self.sig_len, len(signals)))
+
+    def physical(self, start=0, stop=None, channels=None):
+        """float32 physical values for rows start:stop (NaN for invalid samples)"""
+        raw = self.raw[start:stop]
+        gain, baseline = self.gain, self.baseline
+        if channels is not None:
+            raw = raw[:, channels]
+            gain, baseline = gain[channels], baseline[channels]
+        out = (raw.astype(np.float32) - baseline) / gain
+        out[raw == INVALID_SAMPLE] = np.nan
+        return out
+
+    def __len__(self):
+        return self.sig_len
+
+
+def open_record(path):
+    return Record(path)
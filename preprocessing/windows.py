@@ -0,0 +1,92 @@
+"""
+Zero-copy sliding windows over the normalized 5-sensor data.
+
+The normalized array is memory-mapped from a float32 .npy, and windows
+are gathered a batch at a time by start row, so the (n, 60, 5) window
+tensor is never materialized.
+
+The rows concatenate many recordings, so consumers select windows through
+an int64 window-start index built from the record offsets, which leaves
+out every window straddling two recordings.
+"""
+
+import os
+import numpy as np
+
+WINDOW_SIZE = 60
+BATCH_SIZE = 256
+NORM_CSV = "medical_iot_ids/processed/final_5sensor_norm.csv"
+NORM_NPY = "medical_iot_ids/processed/final_5sensor_norm.npy"
+OFFSETS_NPY = "medical_iot_ids/processed/final_5sensor_offsets.npy"
+INDEX_NPY = "medical_iot_ids/processed/final_5sensor_windows.npy"
+
+
+def save_normalized(data, path=NORM_NPY):
+    # Write then rename, so a reader never memory-maps a half-written file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, np.ascontiguousarray(data, dtype=np.float32))
+    os.replace(tmp, path)
+
+
+def load_normalized(path=NORM_NPY, csv_path=NORM_CSV):
+    """Memory-mapped (rows, 5) float32 array, built once from the CSV if needed"""
+    if not os.path.exists(path):
+        save_normalized(np.loadtxt(csv_path, delimiter=",", skiprows=1, ndmin=2), path)
+    return np.load(path, mmap_mode="r")
+
+
+def record_window_starts(offsets, window=WINDOW_SIZE, stride=1):
+    """
+    Window starts that stay inside one record: record i spans rows
+    offsets[i]:offsets[i + 1], and windows shorter records cannot fill
+    are skipped.
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    parts = [np.arange(a, b - window + 1, stride, dtype=np.int64)
+             for a, b in zip(offsets[:-1], offsets[1:]) if b - a >= window]
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+
+def build_window_index(n_rows, window=WINDOW_SIZE, stride=1, offsets_path=OFFSETS_NPY):
+    """Boundary-aware starts, or one record spanning all rows without offsets"""
+    if os.path.exists(offsets_path):
+        offsets = np.load(offsets_path)
+    else:
+        print(f"⚠️ {offsets_path} not found; treating the data as one record")
+        offsets = np.array([0, n_rows], dtype=np.int64)
+    return record_window_starts(offsets, window, stride)
+
+
+def load_window_index(path=INDEX_NPY):
+    return np.load(path, mmap_mode="r")
+
+
+def subsample_starts(starts, stride=1, fraction=1.0, seed=None):
+    """
+    Every `stride`-th window start, then a random `fraction` of those
+    (kept in order). Neighbouring windows share window - stride rows, so
+    a larger stride drops near-duplicates first.
+    """
+    starts = starts[::stride]
+    if fraction < 1.0:
+        keep = max(1, int(round(len(starts) * fraction)))
+        pick = np.random.default_rng(seed).choice(len(starts), keep, replace=False)
+        starts = starts[np.sort(pick)]
+    return np.asarray(starts, dtype=np.int64)
+
+
+def gather_windows(data, starts, window=WINDOW_SIZE):
+    """(len(starts), window, features) float32 copy of just these windows"""
+    rows = np.asarray(starts, dtype=np.int64)[:, None] + np.arange(window)
+    return np.asarray(data[rows], dtype=np.float32)
+
+
+def reconstruction_errors(model, data, starts, window=WINDOW_SIZE, batch_size=BATCH_SIZE):
+    """Per-window autoencoder MSE, gathering and predicting batch by batch"""
+    errors = np.empty(len(starts), dtype=np.float32)
+    for pos in range(0, len(starts), batch_size):
+        batch = gather_windows(data, starts[pos:pos + batch_size], window)
+        recon = model.predict(batch, verbose=0)
+        errors[pos:pos + len(batch)] = np.mean((batch - recon) ** 2, axis=(1, 2))
+    return errors
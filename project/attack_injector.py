@@ -1,3 +1,4 @@
+import os
 import socket
 import time
 import random
@@ -19,9 +20,45 @@ SENSOR_MAP = {
     "S5": "Temp"
 }
 
+
+# ======================================================
+# ATTACK VALUE GENERATORS — (sensor_type, value) for a sensor
+# ======================================================
+def mitm_reading(sid):
+    stype = SENSOR_MAP[sid]
+    if stype == "FHR":
+        value = random.choice([50, 220])
+    elif stype == "SpO2":
+        value = random.randint(70, 85)
+    elif stype == "Temp":
+        value = round(random.uniform(39.5, 41.0), 1)
+    else:
+        value = round(random.uniform(*SENSOR_RANGES[stype]), 1)
+    return stype, value
+
+
+def spoofing_reading(sid):
+    wrong_type = random.choice([t for t in SENSOR_RANGES if t != SENSOR_MAP[sid]])
+    lo, hi = SENSOR_RANGES[wrong_type]
+    return wrong_type, round(random.uniform(lo, hi), 2)
+
+
+def jamming_reading(sid):
+    return SENSOR_MAP[sid], random.choice([0, -1])
+
+
+ATTACK_READINGS = {
+    "mitm": mitm_reading,
+    "spoofing": spoofing_reading,
+    "jamming": jamming_reading,
+}
+
+
 class IoTAttackInjector:
     def __init__(self):
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.episode = 0
+        self.truth = None
 
     # --------------------------------------------------
     def send(self, pkt):
@@ -33,9 +70,23 @@ class IoTAttackInjector:
             "sensor_id": sensor_id,
             "sensor_type": sensor_type,
             "value": value,
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "ts_ms": int(time.time() * 1000),
+            "gt": self.truth
         }
 
+    # --------------------------------------------------
+    def send_attack_start(self, attack):
+        """Stamp the episode start so the collector can time detection"""
+        self.episode += 1
+        self.truth = {"episode": f"{os.getpid()}.{self.episode}", "attack": attack}
+        self.send({
+            "type": "ATTACK_START",
+            "attack": attack,
+            "episode": self.truth["episode"],
+            "ts_ms": int(time.time() * 1000)
+        })
+
     # --------------------------------------------------
     def send_attack_meta(self, count):
         meta = {
@@ -49,21 +100,13 @@ class IoTAttackInjector:
     # ==================================================
     def mitm_attack(self, duration=12):
         print("\n🔴 MITM DATA MANIPULATION ATTACK")
+        self.send_attack_start("mitm")
         end = time.time() + duration
         count = 0
 
         while time.time() < end:
             sid = random.choice(VALID_SENSOR_IDS)
-            stype = SENSOR_MAP[sid]
-
-            if stype == "FHR":
-                value = random.choice([50, 220])
-            elif stype == "SpO2":
-                value = random.randint(70, 85)
-            elif stype == "Temp":
-                value = round(random.uniform(39.5, 41.0), 1)
-            else:
-                value = round(random.uniform(*SENSOR_RANGES[stype]), 1)
+            stype, value = mitm_reading(sid)
 
             pkt = self.attack_packet(sid, stype, value)
             self.send(pkt)
@@ -79,18 +122,13 @@ class IoTAttackInjector:
     # ==================================================
     def spoofing_attack(self, duration=12):
         print("\n🔴 SPOOFING ATTACK")
+        self.send_attack_start("spoofing")
         end = time.time() + duration
         count = 0
 
         while time.time() < end:
             sid = random.choice(VALID_SENSOR_IDS)
-            wrong_type = random.choice(list(SENSOR_RANGES.keys()))
-
-            if wrong_type == SENSOR_MAP[sid]:
-                continue
-
-            lo, hi = SENSOR_RANGES[wrong_type]
-            value = round(random.uniform(lo, hi), 2)
+            wrong_type, value = spoofing_reading(sid)
 
             pkt = self.attack_packet(sid, wrong_type, value)
             self.send(pkt)
@@ -106,13 +144,13 @@ class IoTAttackInjector:
     # ==================================================
     def jamming_attack(self, duration=10):
         print("\n🔴 JAMMING ATTACK")
+        self.send_attack_start("jamming")
         end = time.time() + duration
         count = 0
 
         while time.time() < end:
             sid = random.choice(VALID_SENSOR_IDS)
-            stype = SENSOR_MAP[sid]
-            value = random.choice([0, -1])
+            stype, value = jamming_reading(sid)
 
             pkt = self.attack_packet(sid, stype, value)
             self.send(pkt)
@@ -0,0 +1,173 @@
+"""
+SCRIPTED ATTACK SCENARIOS
+Runs a JSON scenario file of attack steps at precise packet rates (up to
+flood rates) and tags every attack packet with its ground truth, so the
+collector can score each packet as TP / FP / FN / TN live.
+
+Scenario file:
+    {
+      "name": "mixed",
+      "target": "collector",              # or "gateway"
+      "steps": [
+        {"attack": "mitm", "rate": 20, "duration": 10, "sensors": ["S1", "S3"]},
+        {"pause": 5},
+        {"attack": "flood", "rate": 20000, "duration": 3}
+      ]
+    }
+"sensors" defaults to all of S1–S5. Attack types: mitm, spoofing,
+jamming, flood (in-range values at high rate).
+
+Ground truth travels in the packet as "gt": {"episode": id, "attack": type},
+where the episode id ("<pid>.<n>") is unique across concurrent runs.
+It stays in-band, not on a side channel, so it cannot arrive out of step
+with its packet. The gateway forwards it untouched, and the collector
+strips it before detection, so it never reaches the model. The
+ATTACK_START / ATTACK_META control packets are not sensor readings and
+always go straight to the collector, whatever the target.
+
+Usage:  python attack_scenario.py scenarios/mixed.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+
+from config import TARGET_IP, COLLECTOR_PORT, GATEWAY_PORT, SENSOR_RANGES
+from attack_injector import VALID_SENSOR_IDS, SENSOR_MAP, ATTACK_READINGS
+
+# ======================================================
+# CONFIG
+# ======================================================
+TARGET_PORTS = {"collector": COLLECTOR_PORT, "gateway": GATEWAY_PORT}
+MAX_SLEEP = 0.01          # seconds; pacing granularity between sends
+REPORT_INTERVAL = 1.0
+
+
+def flood_reading(sid):
+    stype = SENSOR_MAP[sid]
+    lo, hi = SENSOR_RANGES[stype]
+    return stype, round(random.uniform(lo, hi), 2)
+
+
+READINGS = dict(ATTACK_READINGS, flood=flood_reading)
+
+
+def load_scenario(path):
+    with open(path) as f:
+        scenario = json.load(f)
+    for i, step in enumerate(scenario["steps"]):
+        if "pause" in step:
+            continue
+        if step.get("attack") not in READINGS:
+            raise ValueError(f"step {i}: unknown attack {step.get('attack')!r}")
+        if step.get("rate", 0) <= 0 or step.get("duration", 0) <= 0:
+            raise ValueError(f"step {i}: rate and duration must be positive")
+        unknown = set(step.get("sensors", [])) - set(VALID_SENSOR_IDS)
+        if unknown:
+            raise ValueError(f"step {i}: unknown sensors {sorted(unknown)}")
+    return scenario
+
+
+# ======================================================
+# SCENARIO RUNNER
+# ======================================================
+class ScenarioRunner:
+    """
+    Sends each step at its rate: the number of packets due is computed
+    from elapsed time on the monotonic clock, so pacing does not drift
+    and sends are batched when the rate is above the sleep granularity.
+    """
+
+    def __init__(self, scenario, target_ip=TARGET_IP):
+        self.scenario = scenario
+        port = TARGET_PORTS[scenario.get("target", "collector")]
+        self.target = (target_ip, port)
+        self.control = (target_ip, COLLECTOR_PORT)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.episode = 0
+        self.results = []
+
+    def send(self, pkt):
+        self.sock.sendto(json.dumps(pkt).encode(), self.target)
+
+    def send_control(self, pkt):
+        # The gateway would drop these as Malformed (no sensor_id)
+        self.sock.sendto(json.dumps(pkt).encode(), self.control)
+
+    def episode_id(self):
+        return f"{os.getpid()}.{self.episode}"
+
+    def packet(self, attack, sid):
+        stype, value = READINGS[attack](sid)
+        return {
+            "sensor_id": sid,
+            "sensor_type": stype,
+            "value": value,
+            "ts_ms": int(time.time() * 1000),
+            "gt": {"episode": self.episode_id(), "attack": attack},
+        }
+
+    def run_step(self, step):
+        attack = step["attack"]
+        rate = float(step["rate"])
+        duration = float(step["duration"])
+        sensors = step.get("sensors") or VALID_SENSOR_IDS
+        self.episode += 1
+        print(f"\n🔴 Episode {self.episode}: {attack} | {rate:.0f} pps for {duration}s on {', '.join(sensors)}")
+
+        self.send_control({"type": "ATTACK_START", "attack": attack, "episode": self.episode_id(),
+                   "ts_ms": int(time.time() * 1000)})
+        start = time.monotonic()
+        end = start + duration
+        sent = 0
+        next_report = start + REPORT_INTERVAL
+        while True:
+            now = time.monotonic()
+            if now >= end:
+                break
+            due = int((now - start) * rate) + 1 - sent
+            for _ in range(due):
+                self.send(self.packet(attack, random.choice(sensors)))
+            sent += max(due, 0)
+
+            if now >= next_report:
+                print(f"   t={now - start:5.1f}s | sent={sent} ({sent / (now - start):.0f} pps)")
+                next_report += REPORT_INTERVAL
+            wait = start + sent / rate - time.monotonic()
+            if wait > 0:
+                time.sleep(min(wait, MAX_SLEEP))
+
+        elapsed = time.monotonic() - start
+        self.send_control({"type": "ATTACK_META", "count": sent})
+        result = {"episode": self.episode, "attack": attack, "sent": sent,
+                  "target_pps": rate, "achieved_pps": round(sent / elapsed, 1)}
+        self.results.append(result)
+        print(f"✓ {attack} complete | packets={sent} | {result['achieved_pps']:.0f} pps achieved")
+        return result
+
+    def run(self):
+        print("=" * 70)
+        print(f"ATTACK SCENARIO: {self.scenario.get('name', '-')}")
+        print(f"Target: {self.target[0]}:{self.target[1]} | steps: {len(self.scenario['steps'])}")
+        print("=" * 70)
+        for step in self.scenario["steps"]:
+            if "pause" in step:
+                print(f"\n⏸  Pause {step['pause']}s")
+                time.sleep(step["pause"])
+            else:
+                self.run_step(step)
+        self.sock.close()
+        return self.results
+
+
+# ======================================================
+# MAIN
+# ======================================================
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    ScenarioRunner(load_scenario(sys.argv[1])).run()
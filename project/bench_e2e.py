@@ -0,0 +1,233 @@
+"""
+END-TO-END LOCALHOST BENCHMARK
+Starts collector.py and gateway.py as subprocesses, then ramps offered
+load in steps with the sensor_node load generator. For every step it
+records offered vs sustained pps, loss (from the collector's sequence
+accounting), CPU and RSS of each process (the load generator included)
+and, with --scenario, the
+attack detection latency. Writes a JSON report and names the saturation
+step (first step whose loss or delivery ratio crosses the limits).
+
+Usage:  python bench_e2e.py [--devices 50,100,200,400] [--step-duration 20]
+                            [--scenario scenarios/mixed.json] [--out bench_e2e_report.json]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import urllib.request
+
+import psutil
+
+from config import DASHBOARD_PORT
+
+# ======================================================
+# CONFIG
+# ======================================================
+DEFAULT_STEPS = [50, 100, 200, 400, 800]    # virtual devices (× 5 sensors)
+STEP_DURATION = 20.0
+SETTLE_TIME = 2.0           # seconds to let queues drain after each step
+STARTUP_TIMEOUT = 120.0     # collector loads the LSTM before answering /stats
+SAMPLE_INTERVAL = 0.5
+MAX_LOSS = 0.01             # saturation: loss above 1% ...
+MIN_DELIVERY = 0.95         # ... or sustained pps below 95% of offered
+STATS_URL = f"http://127.0.0.1:{DASHBOARD_PORT}/stats"
+
+
+def fetch_stats():
+    with urllib.request.urlopen(STATS_URL, timeout=2) as r:
+        return json.loads(r.read().decode())
+
+
+def wait_for_collector(proc):
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"collector exited with code {proc.returncode}")
+        try:
+            return fetch_stats()
+        except OSError:
+            time.sleep(1.0)
+    raise RuntimeError("collector did not answer /stats in time")
+
+
+# ======================================================
+# PROCESS SAMPLING
+# ======================================================
+class ProcessSampler:
+    """CPU % (mean over the step) and peak RSS for each named process"""
+
+    def __init__(self, procs):
+        self.procs = {name: psutil.Process(p.pid) for name, p in procs.items()}
+
+    def start(self):
+        self.peak_rss = {name: 0 for name in self.procs}
+        self.cpu_start = {name: sum(p.cpu_times()[:2]) for name, p in self.procs.items()}
+        self.t0 = time.monotonic()
+        self.sample()
+
+    def sample(self):
+        for name, p in self.procs.items():
+            self.peak_rss[name] = max(self.peak_rss[name], p.memory_info().rss)
+
+    def result(self):
+        elapsed = time.monotonic() - self.t0
+        out = {}
+        for name, p in self.procs.items():
+            cpu = sum(p.cpu_times()[:2]) - self.cpu_start[name]
+            out[name] = {
+                "cpu_percent": round(100.0 * cpu / elapsed, 1),
+                "peak_rss_mb": round(self.peak_rss[name] / 2 ** 20, 1),
+            }
+        return out
+
+
+def peak_rss_mb(rusage):
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return round(rusage.ru_maxrss * scale / 2 ** 20, 1)
+
+
+def wait_sampling(proc, sampler):
+    """
+    Sample while proc runs, then reap it with wait4: its CPU and peak RSS
+    come from the rusage, since psutil cannot read an exited process
+    """
+    while True:
+        pid, status, rusage = os.wait4(proc.pid, os.WNOHANG)
+        if pid:
+            break
+        sampler.sample()
+        time.sleep(SAMPLE_INTERVAL)
+    proc.returncode = os.waitstatus_to_exitcode(status) \
+        if hasattr(os, "waitstatus_to_exitcode") else (status >> 8)
+    return rusage
+
+
+# ======================================================
+# BENCHMARK
+# ======================================================
+def run_step(devices, duration, sampler, scenario=None):
+    before = fetch_stats()["sequence"]
+    sampler.start()
+    t0 = time.monotonic()
+
+    load = subprocess.Popen(
+        [sys.executable, "sensor_node.py", "load", "--devices", str(devices),
+         "--duration", str(duration), "--jitter", "0.1", "--json"],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    attack = None
+    if scenario:
+        attack = subprocess.Popen([sys.executable, "attack_scenario.py", scenario],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    rusage = wait_sampling(load, sampler)
+    load_wall = time.monotonic() - t0
+    time.sleep(SETTLE_TIME)
+    sampler.sample()
+    if attack is not None:
+        attack.wait()
+
+    sent = json.loads(load.stdout.read().strip().splitlines()[-1])
+    stats = fetch_stats()
+    after = stats["sequence"]
+    # Counted on arrival, so it does not depend on the tracker's capacity
+    received = after["packets"] - before["packets"]
+    lost = after["totals"]["lost"] - before["totals"]["lost"]
+
+    processes = sampler.result()
+    processes["load_generator"] = {
+        "cpu_percent": round(100.0 * (rusage.ru_utime + rusage.ru_stime) / load_wall, 1),
+        "peak_rss_mb": peak_rss_mb(rusage),
+    }
+
+    return {
+        "devices": devices,
+        "streams": sent["streams"],
+        "offered_pps": sent["achieved_pps"],
+        "sent": sent["sent"],
+        "received": received,
+        "sustained_pps": round(received / sent["elapsed"], 1),
+        "loss": round(lost / max(sent["sent"], 1), 4),
+        "delivery": round(received / max(sent["sent"], 1), 4),
+        "generator": {k: sent[k] for k in ("send_errors", "mean_lag_ms", "max_lag_ms")},
+        "processes": processes,
+        "detection_latency": stats.get("detection_latency"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end sensor→gateway→collector benchmark")
+    parser.add_argument("--devices", default=",".join(map(str, DEFAULT_STEPS)),
+                        help="comma-separated device counts, one step each")
+    parser.add_argument("--step-duration", type=float, default=STEP_DURATION)
+    parser.add_argument("--scenario", default=None, help="attack scenario run during each step")
+    parser.add_argument("--out", default="bench_e2e_report.json")
+    args = parser.parse_args()
+    steps = [int(d) for d in args.devices.split(",")]
+
+    procs = {}
+    try:
+        procs["collector"] = subprocess.Popen(
+            [sys.executable, "collector.py"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        print("⏳ Waiting for collector (model load)...")
+        wait_for_collector(procs["collector"])
+        procs["gateway"] = subprocess.Popen(
+            [sys.executable, "gateway.py"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        time.sleep(1.0)
+        sampler = ProcessSampler(procs)
+
+        results = []
+        saturation = None
+        for devices in steps:
+            print(f"🚀 Step: {devices} devices × 5 sensors for {args.step_duration:.0f}s")
+            r = run_step(devices, args.step_duration, sampler, args.scenario)
+            results.append(r)
+            print(
+                f"   offered {r['offered_pps']:8.0f} pps | sustained {r['sustained_pps']:8.0f} pps | "
+                f"loss {r['loss']:.2%} | " + " | ".join(
+                    f"{n} {p['cpu_percent']:.0f}% CPU {p['peak_rss_mb']:.0f} MB"
+                    for n, p in r["processes"].items()
+                )
+            )
+            if saturation is None and (r["loss"] > MAX_LOSS or r["delivery"] < MIN_DELIVERY):
+                saturation = r
+    finally:
+        for p in procs.values():
+            p.terminate()
+        for p in procs.values():
+            p.wait(timeout=5)
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": {"platform": platform.platform(), "python": platform.python_version(),
+                 "cpus": psutil.cpu_count()},
+        "config": {"step_duration": args.step_duration, "scenario": args.scenario,
+                   "max_loss": MAX_LOSS, "min_delivery": MIN_DELIVERY},
+        "steps": results,
+        "saturation": None if saturation is None else {
+            "devices": saturation["devices"], "offered_pps": saturation["offered_pps"],
+            "sustained_pps": saturation["sustained_pps"],
+        },
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print("=" * 70)
+    if saturation is None:
+        print("✅ No saturation within the tested range")
+    else:
+        print(f"⚠️ Saturation at {saturation['devices']} devices "
+              f"(offered {saturation['offered_pps']:.0f} pps, sustained {saturation['sustained_pps']:.0f} pps)")
+    print(f"📄 Report: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,16 @@
+import sys
 import socket
 import json
 import time
 import numpy as np
 import joblib
-from threading import Thread
-from collections import deque
-from flask import Flask, render_template_string
+from threading import Thread, Lock
+from collections import deque, Counter, defaultdict
+from flask import Flask, render_template_string, jsonify
 from tensorflow.keras.models import load_model
 from config import HOST_IP, COLLECTOR_PORT, SENSOR_RANGES, DASHBOARD_PORT
+from collector_router import HEARTBEAT_ACK
+from seq_tracker import SequenceTracker, JitterBuffer, stream_key
 
 # ======================================================
 # CONFIG
@@ -35,6 +38,21 @@ ATTACK_CONFIRMATION = 3
 RECOVERY_CONFIRMATION = 8
 MIN_ATTACK_DURATION = 1.2
 
+DETECTION_TIMEOUT = 60.0   # seconds an injected episode may wait to be detected
+LATENCY_HISTORY = 1000     # latencies kept per attack type
+
+# Run several collectors side by side: python collector.py [port] [dashboard_port]
+LISTEN_PORT = int(sys.argv[1]) if len(sys.argv) > 1 else COLLECTOR_PORT
+DASHBOARD_LISTEN_PORT = int(sys.argv[2]) if len(sys.argv) > 2 else DASHBOARD_PORT
+
+# Sensor streams (device × sensor) with sequence accounting; enough for
+# the largest load-generator runs (bench_e2e.py) without evictions
+MAX_TRACKED_STREAMS = 65536
+
+# Hold out-of-order sensor packets briefly and release them in sequence
+# order before windowing (coalesced FRAMEs bypass the buffer)
+JITTER_BUFFER = False
+
 # ======================================================
 # LOAD MODEL
 # ======================================================
@@ -68,6 +86,7 @@ NORMAL = 0
 INJECTED_ATTACKS = 0
 DETECTED_ATTACKS = 0
 PENDING_INJECTED = 0
+SEQUENCED_PACKETS = 0      # readings carrying a seq, counted before any accounting
 
 ATTACK_CONFIRMED_IN_SESSION = False
 
@@ -87,6 +106,30 @@ last_attack_summary = {
 
 attack_history = deque(maxlen=6)
 
+# Per-packet ground truth from scripted scenarios (attack_scenario.py)
+packet_truth = Counter()                  # TP / FP / FN / TN
+truth_by_attack = defaultdict(Counter)    # attack type → TP / FN
+
+# Time-to-detect: episodes stamped by ATTACK_START. The ATTACK_ACTIVE flip
+# ("detect") and MIN_ATTACK_DURATION ("confirm") are credited to the episode
+# whose packets ("gt") made up most of the anomalous run behind the flip
+pending_episodes = {}                      # episode id → {"attack", "start"}
+anomaly_episodes = Counter()               # episode id → flagged packets this run
+detecting_episode = None                   # detected, awaiting confirmation
+detect_latency = defaultdict(lambda: {
+    "detect": deque(maxlen=LATENCY_HISTORY),
+    "confirm": deque(maxlen=LATENCY_HISTORY),
+})
+missed_episodes = Counter()
+
+seq_tracker = SequenceTracker(max_tracked=MAX_TRACKED_STREAMS)
+jitter = JitterBuffer() if JITTER_BUFFER else None
+
+# Held by the UDP thread while it handles a datagram and by the Flask
+# routes while they read the counters, so a snapshot never iterates a
+# dict or deque that the receiver is resizing
+stats_lock = Lock()
+
 # ======================================================
 # HELPERS
 # ======================================================
@@ -117,6 +160,78 @@ def security_violation(sensor, value, prev, sid):
     return None
 
 
+def score_packet(truth, flagged):
+    """Count one scored packet against its ground truth (None = normal)"""
+    if truth is None:
+        packet_truth["FP" if flagged else "TN"] += 1
+        return
+    outcome = "TP" if flagged else "FN"
+    packet_truth[outcome] += 1
+    truth_by_attack[truth.get("attack", "-")][outcome] += 1
+
+
+def truth_stats():
+    tp, fp, fn, tn = (packet_truth[k] for k in ("TP", "FP", "FN", "TN"))
+    return {
+        "counts": dict(packet_truth),
+        "precision": round(tp / (tp + fp), 4) if tp + fp else None,
+        "recall": round(tp / (tp + fn), 4) if tp + fn else None,
+        "false_positive_rate": round(fp / (fp + tn), 4) if fp + tn else None,
+        "per_attack": {a: dict(c) for a, c in truth_by_attack.items()},
+    }
+
+
+def expire_episodes(now):
+    for episode, info in list(pending_episodes.items()):
+        if now - info["start"] > DETECTION_TIMEOUT:
+            missed_episodes[info["attack"]] += 1
+            del pending_episodes[episode]
+
+
+def on_attack_start(pkt):
+    now = time.time()
+    expire_episodes(now)
+    pending_episodes[pkt.get("episode")] = {
+        "attack": pkt.get("attack", "-"),
+        "start": pkt.get("ts_ms", now * 1000) / 1000.0,
+    }
+
+
+def record_latency(stage, epoch, episode=None):
+    """Time from the injected start to this detection stage, in seconds"""
+    global detecting_episode
+    if stage == "detect":
+        expire_episodes(epoch)
+        detecting_episode = pending_episodes.pop(episode, None)
+        if detecting_episode is None:
+            return          # false alarm, or the episode was already detected
+    elif detecting_episode is None:
+        return
+
+    latency = max(0.0, epoch - detecting_episode["start"])
+    detect_latency[detecting_episode["attack"]][stage].append(latency)
+    print(f"⏱️ {detecting_episode['attack']} {stage}ed after {latency:.2f}s")
+    if stage == "confirm":
+        detecting_episode = None
+
+
+def latency_stats():
+    out = {}
+    for attack in set(detect_latency) | set(missed_episodes):
+        entry = {"missed": missed_episodes[attack]}
+        for stage, values in detect_latency.get(attack, {}).items():
+            if values:
+                arr = np.array(values)
+                entry[stage] = {
+                    "n": len(arr),
+                    "p50": round(float(np.percentile(arr, 50)), 3),
+                    "p95": round(float(np.percentile(arr, 95)), 3),
+                    "max": round(float(arr.max()), 3),
+                }
+        out[attack] = entry
+    return out
+
+
 def sensors_all_normal():
     for sid in FEATURE_IDS:
         if not sensor_windows[sid]:
@@ -128,144 +243,231 @@ def sensors_all_normal():
     return True
 
 # ======================================================
-# UDP RECEIVER
+# DETECTION
 # ======================================================
-def udp_receiver():
+def process_readings(readings, epoch):
+    """
+    Run one detection step over the readings of one sample instant: a
+    single sensor packet, or all readings of a coalesced FRAME. Every
+    reading is appended to its window, then the LSTM scores the combined
+    window once.
+    """
     global TOTAL, NORMAL, CALIBRATION_DONE, ATTACK_ACTIVE
     global ATTACK_START_TIME, FIRST_ANOMALY_TIME
     global CONSECUTIVE_ANOMALIES, NORMAL_STREAK
-    global LAST_DECISION, INJECTED_ATTACKS, DETECTED_ATTACKS
+    global LAST_DECISION, DETECTED_ATTACKS
     global ATTACK_CONFIRMED_IN_SESSION, PENDING_INJECTED, last_attack_summary
 
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.bind((HOST_IP, COLLECTOR_PORT))
-    print("🛡️ IDS Listening...")
-
-    while True:
-        try:
-            pkt = json.loads(sock.recvfrom(4096)[0].decode())
-            pkt["epoch"] = time.time()
-            pkt["timestamp"] = time.strftime("%H:%M:%S")
-
-            # ---------- ATTACK META ----------
-            if pkt.get("type") == "ATTACK_META":
-                INJECTED_ATTACKS += 1
-                PENDING_INJECTED += 1
-                continue
-
-            sid = pkt["sensor_id"]
-            stype = pkt["sensor_type"]
-            value = pkt["value"]
-
-            if sid not in FEATURE_IDS:
-                continue
-
-            TOTAL += 1
-            prev = last_value[sid]
-            sensor_windows[sid].append(value)
-
-            # ---------- CALIBRATION ----------
-            if not all(len(w) == WINDOW_SIZE for w in sensor_windows.values()):
-                pkt.update({"ids_status": "CALIBRATING", "attack_type": "-", "ids_error": "-"})
-                recent_packets.appendleft(pkt)
-                LAST_DECISION = "CALIBRATING"
-                last_value[sid] = value
-                continue
-
-            # ---------- LSTM ----------
-            window = scaler.transform(
-                np.array([list(sensor_windows[s]) for s in FEATURE_IDS]).T
-            )
-            x = window.reshape(1, WINDOW_SIZE, len(FEATURE_IDS))
-            recon = model.predict(x, verbose=0)
-            error = float(np.mean((x - recon) ** 2))
-
-            if not CALIBRATION_DONE:
-                if security_violation(stype, value, prev, sid) is None:
-                    error_history.append(error)
-
-                if len(error_history) == CALIBRATION_WINDOWS:
-                    compute_threshold()
-                    CALIBRATION_DONE = True
-                    print(f"✅ Calibration complete | Threshold={THRESHOLD:.6f}")
-
-                pkt.update({"ids_status": "CALIBRATING", "attack_type": "-", "ids_error": "-"})
-                recent_packets.appendleft(pkt)
-                last_value[sid] = value
-                continue
+    pkts = []
+    prevs = []
+    truths = []
+    for pkt in readings:
+        sid = pkt["sensor_id"]
+        if sid not in FEATURE_IDS:
+            continue
+        # Ground truth is for scoring only; the detector never sees it
+        truths.append(pkt.pop("gt", None))
+        pkt["epoch"] = epoch
+        pkt["timestamp"] = time.strftime("%H:%M:%S")
+        TOTAL += 1
+        prevs.append(last_value[sid])
+        sensor_windows[sid].append(pkt["value"])
+        pkts.append(pkt)
+
+    if not pkts:
+        return
+
+    def remember_values():
+        for pkt in pkts:
+            last_value[pkt["sensor_id"]] = pkt["value"]
+
+    # ---------- CALIBRATION ----------
+    if not all(len(w) == WINDOW_SIZE for w in sensor_windows.values()):
+        for pkt in pkts:
+            pkt.update({"ids_status": "CALIBRATING", "attack_type": "-", "ids_error": "-"})
+            recent_packets.appendleft(pkt)
+        LAST_DECISION = "CALIBRATING"
+        remember_values()
+        return
 
-            # ---------- DETECTION ----------
-            violation = security_violation(stype, value, prev, sid)
-            is_anomaly = (error > THRESHOLD) and violation is not None
-
-            if is_anomaly:
-                if CONSECUTIVE_ANOMALIES == 0:
-                    FIRST_ANOMALY_TIME = pkt["epoch"]
-                CONSECUTIVE_ANOMALIES += 1
-                NORMAL_STREAK = 0
-            else:
-                NORMAL_STREAK += 1
-                CONSECUTIVE_ANOMALIES = 0
-
-            if CONSECUTIVE_ANOMALIES >= ATTACK_CONFIRMATION and not ATTACK_ACTIVE:
-                ATTACK_ACTIVE = True
-                ATTACK_START_TIME = FIRST_ANOMALY_TIME
-                current_attack["sensors"].clear()
-                current_attack["packets"] = 0
-                current_attack["type_counts"].clear()
-
-            if ATTACK_ACTIVE and not ATTACK_CONFIRMED_IN_SESSION:
-                if pkt["epoch"] - ATTACK_START_TIME >= MIN_ATTACK_DURATION:
-                    ATTACK_CONFIRMED_IN_SESSION = True
-
-            if is_anomaly:
-                pkt["ids_status"] = "ATTACK"
-                pkt["attack_type"] = violation
-                current_attack["packets"] += 1
-                current_attack["sensors"].add(stype)
-                current_attack["type_counts"][violation] = \
-                    current_attack["type_counts"].get(violation, 0) + 1
-            else:
-                pkt["ids_status"] = "NORMAL"
-                pkt["attack_type"] = "-"
-                NORMAL += 1
-
-            pkt["ids_error"] = round(error, 6)
+    # ---------- LSTM ----------
+    window = scaler.transform(
+        np.array([list(sensor_windows[s]) for s in FEATURE_IDS]).T
+    )
+    x = window.reshape(1, WINDOW_SIZE, len(FEATURE_IDS))
+    recon = model.predict(x, verbose=0)
+    error = float(np.mean((x - recon) ** 2))
+
+    violations = [
+        security_violation(pkt["sensor_type"], pkt["value"], prev, pkt["sensor_id"])
+        for pkt, prev in zip(pkts, prevs)
+    ]
+
+    if not CALIBRATION_DONE:
+        if all(v is None for v in violations):
+            error_history.append(error)
+
+        if len(error_history) == CALIBRATION_WINDOWS:
+            compute_threshold()
+            CALIBRATION_DONE = True
+            print(f"✅ Calibration complete | Threshold={THRESHOLD:.6f}")
+
+        for pkt in pkts:
+            pkt.update({"ids_status": "CALIBRATING", "attack_type": "-", "ids_error": "-"})
             recent_packets.appendleft(pkt)
-            LAST_DECISION = "ATTACK" if ATTACK_ACTIVE else "NORMAL"
-
-            # ---------- ATTACK END ----------
-            if ATTACK_ACTIVE and NORMAL_STREAK >= RECOVERY_CONFIRMATION and sensors_all_normal():
-                duration = round(pkt["epoch"] - ATTACK_START_TIME, 1)
-
-                attack_type = max(
-                    current_attack["type_counts"],
-                    key=current_attack["type_counts"].get
-                )
-
-                last_attack_summary = {
-                    "type": attack_type,
-                    "sensors": ", ".join(sorted(current_attack["sensors"])),
-                    "duration": duration,
-                    "packets": current_attack["packets"]
-                }
+        remember_values()
+        return
+
+    # ---------- DETECTION ----------
+    is_anomaly = (error > THRESHOLD) and any(v is not None for v in violations)
+
+    if is_anomaly:
+        if CONSECUTIVE_ANOMALIES == 0:
+            FIRST_ANOMALY_TIME = epoch
+            anomaly_episodes.clear()
+        CONSECUTIVE_ANOMALIES += 1
+        NORMAL_STREAK = 0
+        for violation, truth in zip(violations, truths):
+            if violation is not None and truth:
+                anomaly_episodes[truth.get("episode")] += 1
+    else:
+        NORMAL_STREAK += 1
+        CONSECUTIVE_ANOMALIES = 0
+
+    if CONSECUTIVE_ANOMALIES >= ATTACK_CONFIRMATION and not ATTACK_ACTIVE:
+        ATTACK_ACTIVE = True
+        ATTACK_START_TIME = FIRST_ANOMALY_TIME
+        current_attack["sensors"].clear()
+        current_attack["packets"] = 0
+        current_attack["type_counts"].clear()
+        episode = anomaly_episodes.most_common(1)[0][0] if anomaly_episodes else None
+        record_latency("detect", epoch, episode)
+
+    if ATTACK_ACTIVE and not ATTACK_CONFIRMED_IN_SESSION:
+        if epoch - ATTACK_START_TIME >= MIN_ATTACK_DURATION:
+            ATTACK_CONFIRMED_IN_SESSION = True
+            record_latency("confirm", epoch)
+
+    for pkt, violation, truth in zip(pkts, violations, truths):
+        score_packet(truth, is_anomaly and violation is not None)
+        if is_anomaly and violation is not None:
+            pkt["ids_status"] = "ATTACK"
+            pkt["attack_type"] = violation
+            current_attack["packets"] += 1
+            current_attack["sensors"].add(pkt["sensor_type"])
+            current_attack["type_counts"][violation] = \
+                current_attack["type_counts"].get(violation, 0) + 1
+        else:
+            pkt["ids_status"] = "NORMAL"
+            pkt["attack_type"] = "-"
+            NORMAL += 1
+
+        pkt["ids_error"] = round(error, 6)
+        recent_packets.appendleft(pkt)
+    LAST_DECISION = "ATTACK" if ATTACK_ACTIVE else "NORMAL"
+
+    # ---------- ATTACK END ----------
+    if ATTACK_ACTIVE and NORMAL_STREAK >= RECOVERY_CONFIRMATION and sensors_all_normal():
+        duration = round(epoch - ATTACK_START_TIME, 1)
+
+        attack_type = max(
+            current_attack["type_counts"],
+            key=current_attack["type_counts"].get
+        )
+
+        last_attack_summary = {
+            "type": attack_type,
+            "sensors": ", ".join(sorted(current_attack["sensors"])),
+            "duration": duration,
+            "packets": current_attack["packets"]
+        }
+
+        attack_history.appendleft({
+            "time": time.strftime("%H:%M:%S"),
+            **last_attack_summary
+        })
+
+        if PENDING_INJECTED > 0:
+            DETECTED_ATTACKS += 1
+            PENDING_INJECTED -= 1
+
+        ATTACK_ACTIVE = False
+        ATTACK_CONFIRMED_IN_SESSION = False
+        CONSECUTIVE_ANOMALIES = 0
+        NORMAL_STREAK = 0
+        FIRST_ANOMALY_TIME = None
+
+    remember_values()
 
-                attack_history.appendleft({
-                    "time": time.strftime("%H:%M:%S"),
-                    **last_attack_summary
-                })
+# ======================================================
+# UDP RECEIVER
+# ======================================================
+def handle_datagram(sock, data, addr):
+    global INJECTED_ATTACKS, PENDING_INJECTED, SEQUENCED_PACKETS
+
+    pkt = json.loads(data.decode())
+
+    # ---------- GATEWAY HEARTBEAT ----------
+    if pkt.get("type") == "HEARTBEAT":
+        sock.sendto(HEARTBEAT_ACK, addr)
+        return
+
+    # ---------- ATTACK START (latency) ----------
+    if pkt.get("type") == "ATTACK_START":
+        on_attack_start(pkt)
+        return
+
+    # ---------- ATTACK META ----------
+    if pkt.get("type") == "ATTACK_META":
+        INJECTED_ATTACKS += 1
+        PENDING_INJECTED += 1
+        return
+
+    # ---------- MULTI-SENSOR FRAME ----------
+    if pkt.get("type") == "FRAME":
+        for r in pkt["readings"]:
+            if "seq" in r:
+                SEQUENCED_PACKETS += 1
+                seq_tracker.observe(stream_key(r), r["seq"])
+        process_readings(pkt["readings"], time.time())
+        return
+
+    # ---------- SEQUENCE ACCOUNTING ----------
+    seq = pkt.get("seq")
+    if seq is None:
+        process_readings([pkt], time.time())
+        return
+
+    SEQUENCED_PACKETS += 1
+    key = stream_key(pkt)
+    seq_tracker.observe(key, seq)
+    if jitter is None:
+        process_readings([pkt], time.time())
+    else:
+        for ready in jitter.push(key, seq, pkt):
+            process_readings([ready], time.time())
 
-                if PENDING_INJECTED > 0:
-                    DETECTED_ATTACKS += 1
-                    PENDING_INJECTED -= 1
 
-                ATTACK_ACTIVE = False
-                ATTACK_CONFIRMED_IN_SESSION = False
-                CONSECUTIVE_ANOMALIES = 0
-                NORMAL_STREAK = 0
-                FIRST_ANOMALY_TIME = None
+def udp_receiver():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((HOST_IP, LISTEN_PORT))
+    if jitter is not None:
+        sock.settimeout(jitter.max_delay)
+    print("🛡️ IDS Listening...")
 
-            last_value[sid] = value
+    while True:
+        try:
+            if jitter is not None:
+                with stats_lock:
+                    for held in jitter.expired():
+                        process_readings([held], time.time())
+
+            try:
+                data, addr = sock.recvfrom(4096)
+            except socket.timeout:
+                continue
+            with stats_lock:
+                handle_datagram(sock, data, addr)
 
         except Exception as e:
             print("❌ Collector error:", e)
@@ -389,20 +591,36 @@ const packets={{ packets|tojson }};
 
 @app.route("/")
 def dashboard():
-    rate = round((DETECTED_ATTACKS / INJECTED_ATTACKS) * 100, 2) if INJECTED_ATTACKS else 0
-    return render_template_string(
-        HTML,
-        total=TOTAL,
-        normal=NORMAL,
-        injected=INJECTED_ATTACKS,
-        detected=DETECTED_ATTACKS,
-        rate=rate,
-        decision=LAST_DECISION,
-        packets=list(recent_packets),
-        summary=last_attack_summary,
-        history=list(attack_history)
-    )
+    with stats_lock:
+        rate = round((DETECTED_ATTACKS / INJECTED_ATTACKS) * 100, 2) if INJECTED_ATTACKS else 0
+        view = dict(
+            total=TOTAL,
+            normal=NORMAL,
+            injected=INJECTED_ATTACKS,
+            detected=DETECTED_ATTACKS,
+            rate=rate,
+            decision=LAST_DECISION,
+            packets=list(recent_packets),
+            summary=dict(last_attack_summary),
+            history=list(attack_history)
+        )
+    return render_template_string(HTML, **view)
+
+@app.route("/stats")
+def stats():
+    with stats_lock:
+        snapshot = {
+            "sequence": {
+                "packets": SEQUENCED_PACKETS,
+                "totals": seq_tracker.totals(),
+                "streams": seq_tracker.export(),
+                "jitter_released_late": jitter.released_late if jitter else None,
+            },
+            "ground_truth": truth_stats(),
+            "detection_latency": latency_stats(),
+        }
+    return jsonify(snapshot)
 
 if __name__ == "__main__":
     Thread(target=udp_receiver, daemon=True).start()
-    app.run(host="0.0.0.0", port=DASHBOARD_PORT, debug=False)
+    app.run(host="0.0.0.0", port=DASHBOARD_LISTEN_PORT, debug=False)
@@ -0,0 +1,181 @@
+import json
+import time
+import socket
+import hashlib
+from bisect import bisect
+from collections import Counter
+
+# ======================================================
+# CONFIG
+# ======================================================
+VIRTUAL_NODES = 128          # ring points per collector
+HEARTBEAT_INTERVAL = 1.0     # seconds between heartbeats to each collector
+HEARTBEAT_MAX_MISSED = 3     # unanswered heartbeats before ejection
+ROUTE_CACHE_SIZE = 65536
+
+HEARTBEAT = json.dumps({"type": "HEARTBEAT"}).encode()
+HEARTBEAT_ACK = json.dumps({"type": "HEARTBEAT_ACK"}).encode()
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+def node_name(node):
+    return f"{node[0]}:{node[1]}"
+
+
+# ======================================================
+# CONSISTENT HASH RING
+# ======================================================
+class HashRing:
+    """
+    Consistent hash ring over (ip, port) collectors. Each collector owns
+    VIRTUAL_NODES points, so adding or removing one only remaps the keys
+    that land on its points (about 1/N of them).
+    """
+
+    def __init__(self, nodes=(), vnodes=VIRTUAL_NODES):
+        self.vnodes = vnodes
+        self.points = {}
+        self.members = set()
+        self._keys = []
+        self._owners = []
+        for node in nodes:
+            self.add(node, rebuild=False)
+        self._rebuild()
+
+    def _rebuild(self):
+        ring = sorted(self.points.items())
+        self._keys = [h for h, _ in ring]
+        self._owners = [n for _, n in ring]
+
+    def add(self, node, rebuild=True):
+        name = node_name(node)
+        self.members.add(node)
+        for i in range(self.vnodes):
+            self.points[_hash(f"{name}#{i}")] = node
+        if rebuild:
+            self._rebuild()
+
+    def remove(self, node):
+        self.members.discard(node)
+        self.points = {h: n for h, n in self.points.items() if n != node}
+        self._rebuild()
+
+    def get(self, key):
+        if not self._keys:
+            return None
+        i = bisect(self._keys, _hash(key))
+        return self._owners[i % len(self._owners)]
+
+    def __contains__(self, node):
+        return node in self.members
+
+    def __len__(self):
+        return len(self.members)
+
+
+# ======================================================
+# ROUTER WITH HEARTBEAT EJECTION
+# ======================================================
+class CollectorRouter:
+    """
+    Routes each device (or sensor group) to one collector on the ring and
+    ejects collectors that stop answering heartbeats. An ejected collector
+    is readmitted as soon as it acks again. If every collector is down the
+    full ring is used, so packets are never dropped by the router itself.
+
+    Data goes out on the caller's socket; heartbeats use a separate
+    non-blocking socket (hb_socket) that the caller polls for acks.
+    """
+
+    def __init__(self, collectors, sock, heartbeat_interval=HEARTBEAT_INTERVAL,
+                 max_missed=HEARTBEAT_MAX_MISSED):
+        self.collectors = [tuple(c) for c in collectors]
+        self.sock = sock
+        self.hb_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.hb_socket.setblocking(False)
+        self.heartbeat_interval = heartbeat_interval
+        self.max_missed = max_missed
+
+        self.full_ring = HashRing(self.collectors)
+        self.ring = HashRing(self.collectors)
+        self.awaiting = {c: False for c in self.collectors}
+        self.missed = {c: 0 for c in self.collectors}
+        self.sent = Counter()
+        self.ejections = 0
+        self.next_heartbeat = time.monotonic()
+        self._cache = {}
+
+    # ---------------- ROUTING ----------------
+    def route(self, key):
+        dest = self._cache.get(key)
+        if dest is None:
+            ring = self.ring if len(self.ring) else self.full_ring
+            dest = ring.get(key)
+            if len(self._cache) >= ROUTE_CACHE_SIZE:
+                self._cache.clear()
+            self._cache[key] = dest
+        return dest
+
+    def send(self, payload, key):
+        dest = self.route(key)
+        self.sock.sendto(payload, dest)
+        self.sent[dest] += 1
+
+    # ---------------- HEALTH ----------------
+    def heartbeat(self, now=None):
+        """Send due heartbeats and eject collectors that missed too many"""
+        if now is None:
+            now = time.monotonic()
+        if now < self.next_heartbeat:
+            return
+        self.next_heartbeat = now + self.heartbeat_interval
+
+        for c in self.collectors:
+            if self.awaiting[c]:
+                self.missed[c] += 1
+                if self.missed[c] == self.max_missed and c in self.ring:
+                    self.ring.remove(c)
+                    self._cache.clear()
+                    self.ejections += 1
+                    print(f"⚠️ Collector {node_name(c)} ejected (no heartbeat ack)")
+            try:
+                self.hb_socket.sendto(HEARTBEAT, c)
+                self.awaiting[c] = True
+            except OSError:
+                pass
+
+    def on_ack(self, addr):
+        c = tuple(addr[:2])
+        if c not in self.missed:
+            return
+        self.awaiting[c] = False
+        self.missed[c] = 0
+        if c not in self.ring:
+            self.ring.add(c)
+            self._cache.clear()
+            print(f"✅ Collector {node_name(c)} readmitted")
+
+    def read_acks(self):
+        """Drain pending heartbeat acks from hb_socket"""
+        for _ in range(4 * len(self.collectors) + 4):
+            try:
+                data, addr = self.hb_socket.recvfrom(256)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                # e.g. Windows reports ICMP port-unreachable as a reset
+                continue
+            if data == HEARTBEAT_ACK:
+                self.on_ack(addr)
+
+    def close(self):
+        self.hb_socket.close()
+
+    def stats(self):
+        return {
+            node_name(c): {"sent": self.sent[c], "alive": c in self.ring}
+            for c in self.collectors
+        }
@@ -0,0 +1,82 @@
+import json
+import time
+
+# ======================================================
+# CONFIG
+# ======================================================
+COALESCE_WINDOW = 0.05    # seconds a device's frame stays open
+FRAME_SENSORS = 5         # readings that complete a frame (S1–S5)
+
+
+def build_frame(device_id, payloads):
+    """
+    Wrap already-encoded packets in one FRAME datagram without decoding
+    them: {"type": "FRAME", "device_id": ..., "readings": [pkt, ...]}
+    """
+    return b"".join((
+        b'{"type":"FRAME","device_id":', json.dumps(device_id).encode(),
+        b',"readings":[', b",".join(payloads), b"]}",
+    ))
+
+
+# ======================================================
+# FRAME COALESCER
+# ======================================================
+class FrameCoalescer:
+    """
+    Groups readings from the same device that arrive within `window`
+    seconds into one multi-sensor frame. A frame is flushed as soon as it
+    holds `frame_sensors` readings, or when its window expires. Frames
+    open in arrival order with a fixed window, so the oldest deadline is
+    always first in `pending` and expiry is O(1) per flushed frame.
+    """
+
+    def __init__(self, window=COALESCE_WINDOW, frame_sensors=FRAME_SENSORS):
+        self.window = window
+        self.frame_sensors = frame_sensors
+        self.pending = {}       # device key → (deadline, [payload, ...])
+        self.frames = 0
+        self.readings = 0
+
+    def _flush(self, key, payloads):
+        self.frames += 1
+        self.readings += len(payloads)
+        if len(payloads) == 1:
+            return payloads[0], key
+        return build_frame(key, payloads), key
+
+    def add(self, items, now=None):
+        """Add (payload, key) pairs; return the frames completed by them"""
+        if now is None:
+            now = time.monotonic()
+        ready = []
+        for payload, key in items:
+            entry = self.pending.get(key)
+            if entry is None:
+                entry = (now + self.window, [])
+                self.pending[key] = entry
+            # Payloads may be views into a reused receive buffer
+            entry[1].append(bytes(payload))
+            if len(entry[1]) >= self.frame_sensors:
+                del self.pending[key]
+                ready.append(self._flush(key, entry[1]))
+        return ready
+
+    def expired(self, now=None):
+        """Flush every frame whose window has passed"""
+        if now is None:
+            now = time.monotonic()
+        ready = []
+        while self.pending:
+            key = next(iter(self.pending))
+            deadline, payloads = self.pending[key]
+            if deadline > now:
+                break
+            del self.pending[key]
+            ready.append(self._flush(key, payloads))
+        return ready
+
+    def next_deadline(self):
+        if not self.pending:
+            return None
+        return self.pending[next(iter(self.pending))][0]
@@ -1,8 +1,18 @@
 import socket
+import selectors
 import json
+import re
 import time
-from datetime import datetime
+import zlib
+from collections import Counter
+from functools import lru_cache
 from config import HOST_IP, TARGET_IP, GATEWAY_PORT, COLLECTOR_PORT
+from gateway_logger import GatewayLogger, LOG_SUMMARY_INTERVAL
+from rate_limiter import TokenBucketLimiter
+from collector_router import CollectorRouter, node_name
+from frame_coalescer import FrameCoalescer
+from seq_tracker import SequenceTracker, stream_key, DUPLICATE, LATE, INVALID
+from keystore import MacVerifier, load_keystore, provisioned_devices, key_id, MAC_LEN
 
 # ======================================================
 # CONFIG
@@ -11,29 +21,255 @@ GATEWAY_LISTEN_PORT = GATEWAY_PORT
 COLLECTOR_FORWARD_PORT = COLLECTOR_PORT
 COLLECTOR_IP = "127.0.0.1"
 
+# Collector instances; each device is routed to one of them by consistent
+# hashing on its device_id (packets without one share the "default" route)
+COLLECTORS = [
+    (COLLECTOR_IP, COLLECTOR_FORWARD_PORT),
+]
+DEFAULT_ROUTE_KEY = "default"
+
 VALID_SENSOR_IDS = ['S1', 'S2', 'S3', 'S4', 'S5']
+# Devices whose sensors get their own rate limit; None = those provisioned
+# in the keystore. Any other device_id is limited under the plain sensor ID,
+# so made-up device IDs cannot multiply a sensor's quota.
+VALID_DEVICE_IDS = None
 MAX_PACKETS_PER_SECOND = 50
+MAX_TRACKED_STREAMS = 65536   # per-sensor state slots (virtual devices × 5)
 TIMESTAMP_TOLERANCE = 10
 
 IDS_TESTING_MODE = True   # KEEP TRUE FOR IDS EXPERIMENTS
 
+RECV_BUFFER_SIZE = 4096
+MAX_BURST = 256          # datagrams drained per selector wake-up
+SELECT_TIMEOUT = 0.5
+
+# "decode": json.loads → validate → json.dumps (original behaviour)
+# "passthrough": extract sensor_id / timestamp only, forward original bytes
+FORWARD_MODE = "passthrough"
+
+# Multi-process mode (see gateway_cluster.py): loopback ports on which each
+# worker accepts datagrams for sensors it owns from the other workers
+HANDOFF_BASE_PORT = GATEWAY_PORT + 100
+STATS_INTERVAL = 2.0
+
+# IPsec-style anti-replay: drop a sensor's packets whose seq was already
+# seen, or is older than the last ANTI_REPLAY_WINDOW sequence numbers.
+# Enforced only with AUTH_REQUIRED: without MACs one spoofed packet with a
+# huge seq or boot would move a sensor's window past the real sensor and
+# block it for good, so unauthenticated sequence numbers are only counted
+ANTI_REPLAY = True
+ANTI_REPLAY_WINDOW = 256     # bits per sensor stream (64–1024)
+
+# Require a truncated HMAC-SHA256 tag on every datagram (keys provisioned
+# with keystore.py); forged packets are dropped before JSON decode
+AUTH_REQUIRED = False
+
+# Coalesce readings of one device arriving within COALESCE_WINDOW seconds
+# into a single multi-sensor FRAME datagram (see frame_coalescer.py)
+COALESCE_FRAMES = False
+COALESCE_WINDOW = 0.05
+
+# ======================================================
+# TIMESTAMP PARSING
+# ======================================================
+@lru_cache(maxsize=256)
+def _minute_epoch(prefix):
+    """Epoch seconds (local time) of a 'YYYY-MM-DD HH:MM' prefix"""
+    return time.mktime((
+        int(prefix[0:4]), int(prefix[5:7]), int(prefix[8:10]),
+        int(prefix[11:13]), int(prefix[14:16]), 0, 0, 0, -1
+    ))
+
+
+def parse_legacy_timestamp(ts):
+    """
+    Epoch seconds of a 'YYYY-MM-DD HH:MM:SS[.fff]' string, or None.
+
+    Packets from one sensor share the same minute prefix for 60 s, so the
+    calendar conversion is cached and only the seconds field is parsed.
+    """
+    if len(ts) < 19 or ts[16] != ":" or not ts[17:19].isdigit() or ts[17:19] > "61":
+        return None
+    # Optional fraction: "." and 1–6 digits, as strptime's %f took
+    frac = ts[19:]
+    if frac and not (frac[0] == "." and frac[1:].isdigit() and len(frac) <= 7):
+        return None
+    try:
+        return _minute_epoch(ts[:16]) + float(ts[17:])
+    except ValueError:
+        return None
+
+
+# ======================================================
+# PASS-THROUGH HEADER EXTRACTION
+# ======================================================
+_SENSOR_ID_RE = re.compile(rb'"sensor_id"\s*:\s*"([^"\\]*)"')
+_TS_MS_RE = re.compile(rb'"ts_ms"\s*:\s*(-?\d+)')
+_TIMESTAMP_RE = re.compile(rb'"timestamp"\s*:\s*"([^"\\]*)"')
+_DEVICE_ID_RE = re.compile(rb'"device_id"\s*:\s*"([^"\\]*)"')
+_SEQ_RE = re.compile(rb'"seq"\s*:\s*(\d+)')
+_BOOT_RE = re.compile(rb'"boot"\s*:\s*(\d+)')
+_HEADER_RES = (_SENSOR_ID_RE, _TS_MS_RE, _TIMESTAMP_RE, _DEVICE_ID_RE, _SEQ_RE, _BOOT_RE)
+
+
+# A nested object or any backslash escape: regex matches could then be
+# inside a nested object or miss an escaped key ("sensor\u005fid")
+_NOT_FLAT_RE = re.compile(rb'\\|\{[^{]*\{')
+
+_DUPLICATE = object()
+
+
+def _search_once(regex, data):
+    """The field's only match, None if absent, _DUPLICATE if it appears twice"""
+    m = regex.search(data)
+    if m is not None and regex.search(data, m.end()) is not None:
+        return _DUPLICATE
+    return m
+
+
+def _decode_header(data):
+    """Header fields from a full json.loads, the decode the collector uses"""
+    try:
+        packet = json.loads(bytes(data))
+    except (ValueError, RecursionError):
+        return None
+    if not isinstance(packet, dict) or not isinstance(packet.get("sensor_id"), str):
+        return None
+    header = {"sensor_id": packet["sensor_id"]}
+
+    ts_ms = packet.get("ts_ms")
+    if type(ts_ms) is int:
+        header["ts_ms"] = ts_ms
+    elif isinstance(packet.get("timestamp"), str):
+        header["timestamp"] = packet["timestamp"]
+
+    # Identity fields the gateway cannot key on are refused, not ignored
+    device = packet.get("device_id")
+    if device is not None:
+        if not isinstance(device, str):
+            return None
+        header["device_id"] = device
+
+    seq = packet.get("seq")
+    if type(seq) is int:
+        header["seq"] = seq
+        boot = packet.get("boot")
+        if type(boot) is int:
+            header["boot"] = boot
+    return header
+
+
+def extract_header(data):
+    """
+    Pull just the fields the gateway validates out of a raw datagram
+    (bytes or memoryview). Returns a dict shaped like a decoded packet, or
+    None if there is no sensor_id.
+
+    Flat datagrams (one object, no escapes), which is what sensors send,
+    are read by regex without decoding the JSON body; every match is then
+    a top-level key. A field matched twice (a duplicate key) gives None,
+    since json.loads keeps the last one. Anything else (nested objects,
+    escaped keys) is fully decoded, so the gateway validates and
+    authenticates the same identity the collector scores.
+    """
+    if _NOT_FLAT_RE.search(data) is not None:
+        return _decode_header(data)
+
+    fields = [_search_once(r, data) for r in _HEADER_RES]
+    if any(m is _DUPLICATE for m in fields):
+        return None
+    sid, ts_ms, timestamp, device, seq, boot = fields
+    if sid is None:
+        return None
+    header = {"sensor_id": sid.group(1).decode("ascii", "replace")}
+
+    if ts_ms is not None:
+        header["ts_ms"] = int(ts_ms.group(1))
+    elif timestamp is not None:
+        header["timestamp"] = timestamp.group(1).decode("ascii", "replace")
+
+    if device is not None:
+        header["device_id"] = device.group(1).decode("ascii", "replace")
+
+    if seq is not None:
+        header["seq"] = int(seq.group(1))
+        if boot is not None:
+            header["boot"] = int(boot.group(1))
+    return header
+
+
+def route_key(packet):
+    return str(packet.get("device_id", DEFAULT_ROUTE_KEY))
+
 # ======================================================
 # GATEWAY
 # ======================================================
 class NetworkGateway:
-    def __init__(self):
+    def __init__(self, worker_id=0, n_workers=1, stats_queue=None):
+        self.worker_id = worker_id
+        self.n_workers = n_workers
+        self.stats_queue = stats_queue
+        self.handed_off = 0
+        self.next_report = time.monotonic() + STATS_INTERVAL
+
         self.sensor_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if n_workers > 1:
+            # Every worker binds the same port; the kernel spreads datagrams
+            self.sensor_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         self.sensor_socket.bind((HOST_IP, GATEWAY_LISTEN_PORT))
 
+        self.sensor_socket.setblocking(False)
+        self.recv_buffer = memoryview(bytearray(MAX_BURST * RECV_BUFFER_SIZE))
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.sensor_socket, selectors.EVENT_READ, False)
+
+        self.handoff_socket = None
+        if n_workers > 1:
+            self.handoff_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.handoff_socket.bind(("127.0.0.1", HANDOFF_BASE_PORT + worker_id))
+            self.handoff_socket.setblocking(False)
+            self.selector.register(self.handoff_socket, selectors.EVENT_READ, True)
+
         self.collector_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.packet_tracker = {}
+        self.router = CollectorRouter(COLLECTORS, self.collector_socket)
+        self.selector.register(self.router.hb_socket, selectors.EVENT_READ, "heartbeat")
+        self.rate_limiter = TokenBucketLimiter(
+            rate=MAX_PACKETS_PER_SECOND, known_ids=VALID_SENSOR_IDS,
+            max_unknown=MAX_TRACKED_STREAMS
+        )
+        self.valid_devices = provisioned_devices() if VALID_DEVICE_IDS is None \
+            else set(VALID_DEVICE_IDS)
+        self.timestamp_counts = Counter()
+        self.anti_replay = ANTI_REPLAY and AUTH_REQUIRED
+        self.seq_tracker = SequenceTracker(
+            window=ANTI_REPLAY_WINDOW, max_tracked=MAX_TRACKED_STREAMS,
+            allow_restart=not self.anti_replay
+        )
+        self.log = GatewayLogger(summary_interval=None if stats_queue else LOG_SUMMARY_INTERVAL)
+        self.log.add_stats("timestamps", self.timestamp_stats)
+        self.log.add_stats("collectors", self.router.stats)
+        self.log.add_stats("sequence", self.seq_tracker.totals)
+
+        self.auth = MacVerifier(load_keystore()) if AUTH_REQUIRED else None
+
+        self.coalescer = None
+        if COALESCE_FRAMES:
+            self.coalescer = FrameCoalescer(COALESCE_WINDOW)
+            self.log.add_stats("frames", self.frame_stats)
 
         print("=" * 70)
         print("NETWORK GATEWAY — Medical IoT")
+        if n_workers > 1:
+            print(f"Worker {worker_id + 1}/{n_workers} (SO_REUSEPORT)")
         print("=" * 70)
         print(f"Listening on {HOST_IP}:{GATEWAY_LISTEN_PORT}")
-        print(f"Forwarding to {COLLECTOR_IP}:{COLLECTOR_FORWARD_PORT}")
+        print("Forwarding to", ", ".join(node_name(c) for c in COLLECTORS))
         print("IDS TESTING MODE:", IDS_TESTING_MODE)
+        print("Forward mode:", FORWARD_MODE)
+        print("Packet authentication:", "HMAC-SHA256" if AUTH_REQUIRED else "off")
+        print("Anti-replay:", "on" if self.anti_replay else "off (needs packet authentication)")
+        if COALESCE_FRAMES:
+            print(f"Frame coalescing: {COALESCE_WINDOW * 1000:.0f} ms window")
         print("=" * 70)
         print("✅ Gateway running...\n")
 
@@ -41,86 +277,345 @@ class NetworkGateway:
     def is_valid_sensor_id(self, sensor_id):
         return True if IDS_TESTING_MODE else sensor_id in VALID_SENSOR_IDS
 
-    def check_rate_limit(self, sensor_id):
+    def limit_key(self, packet):
+        """Rate-limit key: device/sensor for known devices, else the sensor ID"""
+        device = packet.get("device_id")
+        if device is not None and device in self.valid_devices:
+            return key_id(packet)
+        return packet.get("sensor_id", "")
+
+    def check_rate_limit(self, sensor_key):
         if IDS_TESTING_MODE:
             return True
-
-        now = time.time()
-        self.packet_tracker.setdefault(sensor_id, [])
-        self.packet_tracker[sensor_id] = [
-            t for t in self.packet_tracker[sensor_id] if now - t < 1
-        ]
-
-        if len(self.packet_tracker[sensor_id]) >= MAX_PACKETS_PER_SECOND:
-            return False
-
-        self.packet_tracker[sensor_id].append(now)
-        return True
+        return self.rate_limiter.allow(sensor_key)
 
     def validate_timestamp(self, ts):
+        """Accept integer epoch milliseconds or a legacy timestamp string"""
+        if type(ts) is int:
+            fmt = "epoch_ms"
+        elif isinstance(ts, str):
+            fmt = "string"
+        else:
+            fmt = "missing"
+
+        # Formats are counted in testing mode too, where everything passes
         if IDS_TESTING_MODE:
+            self.timestamp_counts[fmt, True] += 1
             return True
-        try:
-            pkt_time = datetime.strptime(ts, '%Y-%m-%d %H:%M:%S.%f')
-            return abs((datetime.now() - pkt_time).total_seconds()) <= TIMESTAMP_TOLERANCE
-        except:
-            return False
+
+        if fmt == "epoch_ms":
+            ok = abs(time.time() * 1000 - ts) <= TIMESTAMP_TOLERANCE * 1000
+        elif fmt == "string":
+            pkt_time = parse_legacy_timestamp(ts)
+            ok = pkt_time is not None and abs(time.time() - pkt_time) <= TIMESTAMP_TOLERANCE
+        else:
+            ok = False
+
+        self.timestamp_counts[fmt, ok] += 1
+        return ok
+
+    def timestamp_stats(self):
+        """Accepted / rejected counts per timestamp format"""
+        counts = self.timestamp_counts
+        return {
+            fmt: {"accepted": counts[fmt, True], "rejected": counts[fmt, False]}
+            for fmt in ("epoch_ms", "string", "missing")
+        }
 
     def validate_packet(self, packet):
         sid = packet.get("sensor_id", "")
         if not self.is_valid_sensor_id(sid):
             return False, "Invalid Sensor ID"
-        if not self.check_rate_limit(sid):
-            return False, "Rate Limit"
-        if not self.validate_timestamp(packet.get("timestamp", "")):
+        ts = packet.get("ts_ms")
+        if not self.validate_timestamp(ts if ts is not None else packet.get("timestamp")):
             return False, "Bad Timestamp"
+        # Before the rate limit, so replays burn none of the sensor's tokens
+        status = self.check_sequence(packet)
+        if status is INVALID:
+            return False, "Bad Sequence"
+        if self.anti_replay and (status is DUPLICATE or status is LATE):
+            return False, "Replay"
+        # Limits are per sensor of each known device (plain sensor ID otherwise)
+        if not self.check_rate_limit(self.limit_key(packet)):
+            return False, "Rate Limit"
         return True, "OK"
 
+    def check_sequence(self, packet):
+        """Account the packet's seq; its tracker status, or None without one"""
+        seq = packet.get("seq")
+        if type(seq) is not int:
+            return None
+        return self.seq_tracker.observe(stream_key(packet), seq)
+
+    # ---------------- WORKER PARTITIONING ----------------
+    def owner_of(self, sensor_key):
+        """
+        Worker that owns a sensor's rate-limit state. The kernel picks the
+        receiving worker by address, so a sensor ID arriving from several
+        sources would otherwise get a full quota on every worker.
+        """
+        return zlib.crc32(sensor_key.encode()) % self.n_workers
+
+    def handoff(self, owner, data):
+        """
+        Pass a datagram to its owner as it arrived, MAC included: the
+        handoff port is a plain local socket, so the owner verifies again
+        """
+        self.collector_socket.sendto(data, ("127.0.0.1", HANDOFF_BASE_PORT + owner))
+        self.handed_off += 1
+
+    def stats_snapshot(self):
+        return {
+            "worker": self.worker_id,
+            "forwarded": self.log.forwarded,
+            "blocked": dict(self.log.blocked),
+            "handed_off": self.handed_off,
+            "per_collector": {node_name(c): n for c, n in self.router.sent.items()},
+            "sequence": self.seq_tracker.totals(),
+        }
+
+    def maybe_report(self):
+        """Push counters to the cluster supervisor every STATS_INTERVAL"""
+        if self.stats_queue is None:
+            return
+        now = time.monotonic()
+        if now >= self.next_report:
+            self.next_report = now + STATS_INTERVAL
+            try:
+                self.stats_queue.put_nowait(self.stats_snapshot())
+            except Exception:
+                pass
+
     # ---------------- FORWARD ----------------
     def forward_to_collector(self, packet):
-        self.collector_socket.sendto(
-            json.dumps(packet).encode(),
-            (COLLECTOR_IP, COLLECTOR_FORWARD_PORT)
-        )
+        self.router.send(json.dumps(packet).encode(), route_key(packet))
+
+    def forward_burst(self, items, readings=None):
+        """Send a burst of (payload, route key) pairs back to back"""
+        route = self.router.route
+        sent = self.router.sent
+        sendto = self.collector_socket.sendto
+        for payload, key in items:
+            dest = route(key)
+            sendto(payload, dest)
+            sent[dest] += 1
+        self.log.count_forwarded(len(items) if readings is None else readings)
+
+    def frame_stats(self):
+        c = self.coalescer
+        return {
+            "frames": c.frames,
+            "readings": c.readings,
+            "readings_per_frame": round(c.readings / c.frames, 2) if c.frames else 0,
+            "open": len(c.pending),
+        }
+
+    # ---------------- BATCH PROCESSING ----------------
+    def drain(self, sock):
+        """Read every pending datagram (up to MAX_BURST) without blocking"""
+        batch = []
+        recvfrom = sock.recvfrom
+        while len(batch) < MAX_BURST:
+            try:
+                data, addr = recvfrom(RECV_BUFFER_SIZE)
+            except (BlockingIOError, InterruptedError):
+                break
+            batch.append(data)
+        return batch
+
+    def drain_into(self, sock):
+        """
+        Like drain(), but receive straight into the preallocated buffer and
+        return memoryview slices of it. The slices are only valid until the
+        next call, which is fine because each burst is forwarded first.
+        """
+        batch = []
+        recvfrom_into = sock.recvfrom_into
+        buf = self.recv_buffer
+        offset = 0
+        while len(batch) < MAX_BURST:
+            try:
+                n, addr = recvfrom_into(buf[offset:offset + RECV_BUFFER_SIZE])
+            except (BlockingIOError, InterruptedError):
+                break
+            batch.append(buf[offset:offset + n])
+            offset += RECV_BUFFER_SIZE
+        return batch
+
+    def authenticate(self, data):
+        """
+        Split off and check the MAC trailer. Returns (body, header), or
+        (None, None) after counting the drop. The key is chosen from the
+        identity extract_header() reads, which is the one the collector decodes.
+        """
+        if len(data) <= MAC_LEN:
+            self.log.count_blocked("Bad MAC")
+            return None, None
+        body = data[:-MAC_LEN]
+        header = extract_header(body)
+        if header is None:
+            self.log.count_blocked("Malformed")
+            return None, None
+        if not self.auth.verify(key_id(header), body, data[-MAC_LEN:]):
+            self.log.count_blocked("Bad MAC")
+            return None, None
+        return body, header
+
+    def process_batch_passthrough(self, batch, owned=False):
+        """Validate raw datagrams by header extraction; forward them untouched"""
+        return self.process_each(batch, owned, self.process_datagram_passthrough)
+
+    def process_datagram_passthrough(self, view, owned=False):
+        """Check one raw datagram; (view, route key) to forward, or None"""
+        signed = view
+        if self.auth is not None:
+            view, header = self.authenticate(view)
+            if view is None:
+                return None
+        else:
+            header = extract_header(view)
+        if header is None:
+            self.log.count_blocked("Malformed")
+            return None
+
+        if not owned and self.n_workers > 1:
+            owner = self.owner_of(self.limit_key(header))
+            if owner != self.worker_id:
+                self.handoff(owner, signed)
+                return None
+
+        is_valid, reason = self.validate_packet(header)
+
+        if is_valid:
+            if self.log.allow_line():
+                self.log.info(
+                    f"➡️ FORWARDED [{header.get('ts_ms', header.get('timestamp', '--'))}] "
+                    f"{header['sensor_id']} | {len(view)} bytes"
+                )
+            return view, route_key(header)
+
+        self.log.count_blocked(reason)
+        if self.log.allow_line():
+            self.log.info(f"🚫 BLOCKED [{reason}] {header['sensor_id']}")
+        return None
+
+    def process_batch(self, batch, owned=False):
+        """Validate a drained batch and return the payloads to forward"""
+        return self.process_each(batch, owned, self.process_packet)
+
+    def process_each(self, batch, owned, process_one):
+        """Run process_one over a batch; collect what it returns to forward"""
+        out = []
+        for data in batch:
+            # One bad datagram must not cost the rest of the burst
+            try:
+                item = process_one(data, owned)
+            except Exception as e:
+                self.log.count_blocked("Malformed")
+                if self.log.allow_line():
+                    self.log.info(f"⚠️ Dropped malformed packet: {e}")
+                continue
+            if item is not None:
+                out.append(item)
+        return out
+
+    def process_packet(self, data, owned=False):
+        """Decode and validate one datagram; (payload, route key) to forward, or None"""
+        signed = data
+        if self.auth is not None:
+            data, _ = self.authenticate(data)
+            if data is None:
+                return None
+        try:
+            packet = json.loads(data.decode())
+        except Exception as e:
+            packet, error = None, e
+        else:
+            error = f"expected a JSON object, got {type(packet).__name__}"
+        if not isinstance(packet, dict):
+            self.log.count_blocked("Malformed")
+            if self.log.allow_line():
+                self.log.info(f"⚠️ Dropped malformed packet: {error}")
+            return None
+
+        if not owned and self.n_workers > 1:
+            owner = self.owner_of(str(self.limit_key(packet)))
+            if owner != self.worker_id:
+                self.handoff(owner, signed)
+                return None
+
+        is_valid, reason = self.validate_packet(packet)
+
+        if is_valid:
+            if self.log.allow_line():
+                self.log.info(
+                    f"➡️ FORWARDED [{packet.get('timestamp','--')}] "
+                    f"{packet.get('sensor_id','?')} | "
+                    f"{packet.get('sensor_type','?')} : {packet.get('value','?')}"
+                )
+            return json.dumps(packet).encode(), route_key(packet)
+
+        self.log.count_blocked(reason)
+        if self.log.allow_line():
+            self.log.info(
+                f"🚫 BLOCKED [{reason}] "
+                f"{packet.get('sensor_id','?')} | "
+                f"{packet.get('sensor_type','?')} : {packet.get('value','?')}"
+            )
+        return None
 
     # ---------------- MAIN LOOP ----------------
+    def handle_readable(self, sock, owned):
+        """Drain everything pending on sock, then forward it in one burst"""
+        if FORWARD_MODE == "passthrough":
+            out = self.process_batch_passthrough(self.drain_into(sock), owned)
+        else:
+            out = self.process_batch(self.drain(sock), owned)
+        if not out:
+            return
+        if self.coalescer is None:
+            self.forward_burst(out)
+        else:
+            self.forward_burst(self.coalescer.add(out), readings=len(out))
+
+    def select_timeout(self):
+        """Wake up in time to flush the oldest open frame"""
+        if self.coalescer is None:
+            return SELECT_TIMEOUT
+        deadline = self.coalescer.next_deadline()
+        if deadline is None:
+            return SELECT_TIMEOUT
+        return min(SELECT_TIMEOUT, max(0.0, deadline - time.monotonic()))
+
     def run(self):
         while True:
             try:
-                # 🔴 CRITICAL FIX: buffer size increased
-                data, addr = self.sensor_socket.recvfrom(4096)
-
-                try:
-                    packet = json.loads(data.decode())
-                except Exception as e:
-                    print("⚠️ Dropped malformed packet:", e)
-                    continue
-
-                is_valid, reason = self.validate_packet(packet)
-
-                if is_valid:
-                    self.forward_to_collector(packet)
-                    print(
-                        f"➡️ FORWARDED [{packet.get('timestamp','--')}] "
-                        f"{packet.get('sensor_id','?')} | "
-                        f"{packet.get('sensor_type','?')} : {packet.get('value','?')}"
-                    )
-                else:
-                    print(
-                        f"🚫 BLOCKED [{reason}] "
-                        f"{packet.get('sensor_id','?')} | "
-                        f"{packet.get('sensor_type','?')} : {packet.get('value','?')}"
-                    )
+                for key, _ in self.selector.select(timeout=self.select_timeout()):
+                    if key.data == "heartbeat":
+                        self.router.read_acks()
+                    else:
+                        self.handle_readable(key.fileobj, key.data)
+                if self.coalescer is not None:
+                    frames = self.coalescer.expired()
+                    if frames:
+                        self.forward_burst(frames, readings=0)
+                self.router.heartbeat()
+                self.maybe_report()
 
             except KeyboardInterrupt:
                 print("\n🛑 Gateway stopped by user")
                 break
             except Exception as e:
                 # 🔥 THIS PREVENTS TERMINATION
-                print("❌ Gateway error (ignored):", e)
+                self.log.info(f"❌ Gateway error (ignored): {e}")
                 time.sleep(0.2)
 
+        self.log.stop()
+        self.selector.close()
         self.sensor_socket.close()
+        if self.handoff_socket is not None:
+            self.handoff_socket.close()
+        self.router.close()
         self.collector_socket.close()
 
 # ======================================================
@@ -0,0 +1,136 @@
+"""
+MULTI-PROCESS GATEWAY
+Starts N NetworkGateway workers that all bind GATEWAY_PORT with
+SO_REUSEPORT, so the kernel spreads sensor datagrams across cores.
+Each sensor ID is owned by exactly one worker (crc32 % N) which keeps its
+rate-limit state; the others hand the datagram over on loopback.
+The supervisor aggregates the workers' forwarded / blocked counters.
+
+Usage:  python gateway_cluster.py [n_workers]
+"""
+
+import os
+import sys
+import time
+import queue
+import socket
+import multiprocessing as mp
+from collections import Counter
+
+from config import HOST_IP, GATEWAY_PORT
+
+# ======================================================
+# CONFIG
+# ======================================================
+DEFAULT_WORKERS = os.cpu_count() or 2
+SUMMARY_INTERVAL = 5.0
+
+
+# ======================================================
+# WORKER
+# ======================================================
+def worker_main(worker_id, n_workers, stats_queue):
+    from gateway import NetworkGateway
+    NetworkGateway(worker_id, n_workers, stats_queue).run()
+
+
+# ======================================================
+# SUPERVISOR
+# ======================================================
+class GatewaySupervisor:
+    def __init__(self, n_workers=DEFAULT_WORKERS):
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise RuntimeError("SO_REUSEPORT is not available on this platform")
+
+        self.n_workers = n_workers
+        self.stats_queue = mp.Queue()
+        self.latest = {}
+        self.workers = [
+            mp.Process(target=worker_main, args=(i, n_workers, self.stats_queue), daemon=True)
+            for i in range(n_workers)
+        ]
+
+    def totals(self):
+        """Sum the most recent snapshot from every worker"""
+        forwarded = 0
+        handed_off = 0
+        blocked = Counter()
+        per_collector = Counter()
+        sequence = Counter()
+        for snap in self.latest.values():
+            forwarded += snap["forwarded"]
+            handed_off += snap["handed_off"]
+            blocked.update(snap["blocked"])
+            per_collector.update(snap["per_collector"])
+            seq = dict(snap["sequence"])
+            depth = seq.pop("max_reorder_depth")
+            sequence.update(seq)
+            sequence["max_reorder_depth"] = max(sequence["max_reorder_depth"], depth)
+        return forwarded, blocked, handed_off, per_collector, sequence
+
+    def summary_line(self, elapsed, last_forwarded):
+        forwarded, blocked, handed_off, per_collector, sequence = self.totals()
+        reasons = ", ".join(f"{r}={c}" for r, c in sorted(blocked.items())) or "none"
+        per_worker = " ".join(
+            f"w{w}={self.latest[w]['forwarded']}" for w in sorted(self.latest)
+        )
+        collectors = " ".join(f"{c}={n}" for c, n in sorted(per_collector.items()))
+        return (
+            f"📊 cluster | {len(self.latest)}/{self.n_workers} workers reporting | "
+            f"forwarded={forwarded} ({(forwarded - last_forwarded) / elapsed:.1f} pps) | "
+            f"blocked: {reasons} | handed off={handed_off}\n   per worker: {per_worker}"
+            f"\n   per collector: {collectors or '-'}"
+            f"\n   sequence: {dict(sequence)}"
+        )
+
+    def run(self):
+        print("=" * 70)
+        print("GATEWAY CLUSTER — Medical IoT")
+        print("=" * 70)
+        print(f"Workers: {self.n_workers} on {HOST_IP}:{GATEWAY_PORT} (SO_REUSEPORT)")
+        print("=" * 70)
+
+        for w in self.workers:
+            w.start()
+
+        last_forwarded = 0
+        last_summary = time.monotonic()
+        try:
+            while True:
+                try:
+                    snap = self.stats_queue.get(timeout=0.5)
+                    self.latest[snap["worker"]] = snap
+                except queue.Empty:
+                    pass
+
+                now = time.monotonic()
+                if now - last_summary >= SUMMARY_INTERVAL:
+                    print(self.summary_line(now - last_summary, last_forwarded))
+                    last_forwarded = self.totals()[0]
+                    last_summary = now
+
+                for i, w in enumerate(self.workers):
+                    if not w.is_alive():
+                        print(f"⚠️ Worker {i} exited (code {w.exitcode}), restarting")
+                        self.workers[i] = mp.Process(
+                            target=worker_main, args=(i, self.n_workers, self.stats_queue),
+                            daemon=True
+                        )
+                        self.workers[i].start()
+
+        except KeyboardInterrupt:
+            print("\n🛑 Gateway cluster stopped by user")
+
+        for w in self.workers:
+            w.join(timeout=2.0)
+            if w.is_alive():
+                w.terminate()
+        print(self.summary_line(max(time.monotonic() - last_summary, 1e-9), last_forwarded))
+
+
+# ======================================================
+# MAIN
+# ======================================================
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_WORKERS
+    GatewaySupervisor(n).run()
@@ -0,0 +1,122 @@
+import queue
+import time
+from collections import Counter
+from threading import Thread
+
+# ======================================================
+# CONFIG
+# ======================================================
+LOG_QUEUE_SIZE = 1000
+LOG_MAX_LINES_PER_SEC = 10      # per-packet lines allowed through per second
+LOG_SUMMARY_INTERVAL = 5.0      # seconds between summary lines
+
+
+# ======================================================
+# QUEUE-BACKED GATEWAY LOGGER
+# ======================================================
+class GatewayLogger:
+    """
+    Console logger that keeps printing off the packet path.
+
+    The gateway only bumps counters and, while the per-second line budget
+    lasts, enqueues a pre-formatted line. A daemon thread prints the queue
+    and a periodic summary of forwarded / blocked counts per reason
+    (summary_interval=None leaves summaries to someone else, e.g. the
+    cluster supervisor).
+    """
+
+    def __init__(self, summary_interval=LOG_SUMMARY_INTERVAL,
+                 max_lines_per_sec=LOG_MAX_LINES_PER_SEC,
+                 queue_size=LOG_QUEUE_SIZE):
+        self.summary_interval = summary_interval
+        self.max_lines_per_sec = max_lines_per_sec
+        self.lines = queue.Queue(maxsize=queue_size)
+
+        self.forwarded = 0
+        self.blocked = Counter()
+        self.suppressed = 0
+
+        self._budget = max_lines_per_sec
+        self._budget_reset = time.monotonic() + 1.0
+        self._last_forwarded = 0
+        self._last_blocked = Counter()
+        self.stats = []
+        self.running = True
+
+        self.thread = Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    # ---------------- PACKET PATH ----------------
+    def allow_line(self):
+        """True while this second's per-packet line budget is not used up"""
+        now = time.monotonic()
+        if now >= self._budget_reset:
+            self._budget = self.max_lines_per_sec
+            self._budget_reset = now + 1.0
+        if self._budget > 0:
+            self._budget -= 1
+            return True
+        self.suppressed += 1
+        return False
+
+    def count_forwarded(self, n=1):
+        self.forwarded += n
+
+    def count_blocked(self, reason, n=1):
+        self.blocked[reason] += n
+
+    def info(self, line):
+        """Enqueue a line without ever blocking the caller"""
+        try:
+            self.lines.put_nowait(line)
+        except queue.Full:
+            self.suppressed += 1
+
+    def add_stats(self, name, provider):
+        """Add a 'name: provider()' line under every summary"""
+        self.stats.append((name, provider))
+
+    # ---------------- LOGGER THREAD ----------------
+    def summary_line(self):
+        blocked = dict(self.blocked)
+        forwarded = self.forwarded
+        d_fwd = forwarded - self._last_forwarded
+        d_blk = {r: c - self._last_blocked.get(r, 0) for r, c in blocked.items()}
+        self._last_forwarded = forwarded
+        self._last_blocked = Counter(blocked)
+
+        reasons = ", ".join(f"{r}={c}" for r, c in sorted(d_blk.items()) if c) or "none"
+        line = (
+            f"📊 last {self.summary_interval:.0f}s | forwarded={d_fwd} "
+            f"({d_fwd / self.summary_interval:.1f} pps) | blocked: {reasons} | "
+            f"total forwarded={forwarded} blocked={sum(blocked.values())} "
+            f"suppressed lines={self.suppressed}"
+        )
+        for name, provider in self.stats:
+            line += f"\n   {name}: {provider()}"
+        return line
+
+    def _run(self):
+        if self.summary_interval is None:
+            while self.running:
+                try:
+                    print(self.lines.get(timeout=0.5))
+                except queue.Empty:
+                    pass
+            return
+
+        next_summary = time.monotonic() + self.summary_interval
+        while self.running:
+            try:
+                print(self.lines.get(timeout=max(0.0, next_summary - time.monotonic())))
+            except queue.Empty:
+                pass
+            if time.monotonic() >= next_summary:
+                print(self.summary_line())
+                next_summary += self.summary_interval
+
+    def stop(self):
+        self.running = False
+        self.thread.join(timeout=1.0)
+        if self.summary_interval is not None:
+            print(self.summary_line())
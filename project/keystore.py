@@ -0,0 +1,89 @@
+"""
+PER-SENSOR PACKET AUTHENTICATION
+Each datagram is the JSON body followed by a truncated HMAC-SHA256 tag
+(MAC_LEN raw bytes) keyed per sensor. Keys come from a local JSON
+keystore: {"S1": "<hex key>", "D00001/S1": "<hex key>", ...}
+
+Provision keys:  python keystore.py [sensor_or_device/sensor ...]
+                 python keystore.py --devices N   (virtual devices D00000…)
+"""
+
+import os
+import sys
+import hmac
+import json
+import hashlib
+
+# ======================================================
+# CONFIG
+# ======================================================
+KEYSTORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "keystore.json")
+MAC_LEN = 16                 # bytes of the SHA-256 tag kept (128 bits)
+KEY_BYTES = 32
+DEFAULT_KEY_IDS = ["S1", "S2", "S3", "S4", "S5"]
+
+
+def key_id(packet):
+    """Keys are per sensor, and per device when packets carry a device_id"""
+    sid = packet.get("sensor_id", "")
+    device = packet.get("device_id")
+    return sid if device is None else f"{device}/{sid}"
+
+
+def load_keystore(path=KEYSTORE_PATH):
+    with open(path) as f:
+        return {kid: bytes.fromhex(key) for kid, key in json.load(f).items()}
+
+
+def provisioned_devices(path=KEYSTORE_PATH):
+    """Device IDs with at least one key ("D00001/S1" → "D00001"); empty without a keystore"""
+    if not os.path.exists(path):
+        return set()
+    return {kid.split("/", 1)[0] for kid in load_keystore(path) if "/" in kid}
+
+
+def save_keystore(keys, path=KEYSTORE_PATH):
+    with open(path, "w") as f:
+        json.dump({kid: key.hex() for kid, key in keys.items()}, f, indent=1)
+
+
+def sign(key, body):
+    """body + truncated HMAC-SHA256 tag"""
+    return body + hmac.new(key, body, hashlib.sha256).digest()[:MAC_LEN]
+
+
+# ======================================================
+# VERIFIER
+# ======================================================
+class MacVerifier:
+    """
+    Verifies tags with a precomputed HMAC state per key: the inner/outer
+    padded key blocks are hashed once at load, and each packet only
+    copies that state and hashes its own body.
+    """
+
+    def __init__(self, keys):
+        self.base = {kid: hmac.new(key, digestmod=hashlib.sha256) for kid, key in keys.items()}
+
+    def verify(self, kid, body, tag):
+        base = self.base.get(kid)
+        if base is None:
+            return False
+        h = base.copy()
+        h.update(body)
+        return hmac.compare_digest(h.digest()[:MAC_LEN], tag)
+
+
+# ======================================================
+# MAIN — PROVISION KEYS
+# ======================================================
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--devices"]:
+        key_ids = [f"D{d:05d}/{sid}" for d in range(int(sys.argv[2])) for sid in DEFAULT_KEY_IDS]
+    else:
+        key_ids = sys.argv[1:] or DEFAULT_KEY_IDS
+    keys = load_keystore() if os.path.exists(KEYSTORE_PATH) else {}
+    for kid in key_ids:
+        keys.setdefault(kid, os.urandom(KEY_BYTES))
+    save_keystore(keys)
+    print(f"✅ {len(keys)} keys in {KEYSTORE_PATH}")
@@ -0,0 +1,82 @@
+import time
+from array import array
+from collections import OrderedDict
+
+# ======================================================
+# CONFIG
+# ======================================================
+DEFAULT_RATE = 50           # tokens (packets) refilled per second
+MAX_UNKNOWN_SENSORS = 1024  # LRU slots for sensor IDs outside the known set
+
+
+# ======================================================
+# TOKEN-BUCKET RATE LIMITER
+# ======================================================
+class TokenBucketLimiter:
+    """
+    Per-sensor token bucket with O(1) work per packet.
+
+    Bucket state lives in two flat arrays (tokens, last refill time) indexed
+    by a slot number. Known sensor IDs own a fixed slot; any other ID gets
+    a slot from a bounded LRU, so a flood of made-up IDs recycles the oldest
+    slots instead of growing memory.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=None, known_ids=(),
+                 max_unknown=MAX_UNKNOWN_SENSORS):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else rate)
+
+        self.known = {sid: i for i, sid in enumerate(known_ids)}
+        self.unknown = OrderedDict()
+        self.max_unknown = max_unknown
+        self.first_unknown = len(self.known)
+
+        capacity = len(self.known) + max_unknown
+        self.tokens = array("d", [self.burst]) * capacity
+        self.stamp = array("d", [time.monotonic()]) * capacity
+        self.evictions = 0
+
+    def _slot(self, sensor_id, now):
+        slot = self.known.get(sensor_id)
+        if slot is not None:
+            return slot
+
+        slot = self.unknown.get(sensor_id)
+        if slot is not None:
+            self.unknown.move_to_end(sensor_id)
+            return slot
+
+        if len(self.unknown) < self.max_unknown:
+            slot = self.first_unknown + len(self.unknown)
+        else:
+            _, slot = self.unknown.popitem(last=False)
+            self.evictions += 1
+
+        self.unknown[sensor_id] = slot
+        self.tokens[slot] = self.burst
+        self.stamp[slot] = now
+        return slot
+
+    def allow(self, sensor_id, now=None):
+        """Take one token for sensor_id; False when its bucket is empty"""
+        if now is None:
+            now = time.monotonic()
+        i = self._slot(sensor_id, now)
+
+        # A clock behind the bucket's stamp (another time base, or the
+        # initial monotonic stamps) refills nothing rather than draining
+        elapsed = now - self.stamp[i]
+        tokens = self.tokens[i] + (elapsed * self.rate if elapsed > 0.0 else 0.0)
+        if tokens > self.burst:
+            tokens = self.burst
+        self.stamp[i] = now
+
+        if tokens < 1.0:
+            self.tokens[i] = tokens
+            return False
+        self.tokens[i] = tokens - 1.0
+        return True
+
+    def tracked(self):
+        return len(self.known) + len(self.unknown)
@@ -2,31 +2,60 @@
 # FILE 1: project/sensor_node.py (COMPLETE FIXED VERSION)
 ################################################################################
 
+import sys
 import socket
 import time
+import heapq
 import random
 import json
+import argparse
 import threading
 from datetime import datetime
 from config import TARGET_IP, GATEWAY_PORT, SENSOR_SEND_INTERVAL, SENSOR_RANGES
+from keystore import load_keystore, sign
 
 UDP_IP = TARGET_IP
 UDP_PORT = GATEWAY_PORT
 
+# Sign packets with the sensor's key (must match the gateway's AUTH_REQUIRED)
+SIGN_PACKETS = False
+
+SENSOR_CONFIGS = [
+    ('S1', 'FHR'),
+    ('S2', 'TOCO'),
+    ('S3', 'SpO2'),
+    ('S4', 'RespRate'),
+    ('S5', 'Temp')
+]
+
+# Load-generator defaults (python sensor_node.py load ...)
+LOAD_REPORT_INTERVAL = 1.0
+LOAD_MAX_SLEEP = 0.05
+
+
+def normal_value(min_val, max_val):
+    center = (min_val + max_val) / 2
+    variation = (max_val - min_val) * 0.15
+    return round(random.uniform(center - variation, center + variation), 2)
+
 
 class MedicalSensor:
-    def __init__(self, sensor_id, sensor_type):
+    def __init__(self, sensor_id, sensor_type, source=None):
         self.sensor_id = sensor_id
         self.sensor_type = sensor_type
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.min_val, self.max_val = SENSOR_RANGES[sensor_type]
+        self.source = source    # DatasetSource, or None for random values
+        self.seq = 0
+        self.boot = int(time.time())
+        self.mac_key = load_keystore()[sensor_id] if SIGN_PACKETS else None
         self.running = True
 
     def generate_normal_value(self):
         """Generate realistic sensor value with slight variation"""
-        center = (self.min_val + self.max_val) / 2
-        variation = (self.max_val - self.min_val) * 0.15
-        return round(random.uniform(center - variation, center + variation), 2)
+        if self.source is not None:
+            return self.source.value(self.sensor_type, 0, self.seq)
+        return normal_value(self.min_val, self.max_val)
 
     def create_packet(self):
         """Create a data packet - NO ATTACK LABELS"""
@@ -34,10 +63,14 @@ class MedicalSensor:
             'sensor_id': self.sensor_id,
             'sensor_type': self.sensor_type,
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3],
+            'ts_ms': int(time.time() * 1000),
+            'seq': self.seq,
+            'boot': self.boot,
             'value': self.generate_normal_value()
             # ❌ REMOVED: 'is_attack': 0
             # ❌ REMOVED: 'attack_type': '-'
         }
+        self.seq += 1
         return json.dumps(packet)
 
     def send_data(self):
@@ -45,7 +78,10 @@ class MedicalSensor:
         try:
             while self.running:
                 packet = self.create_packet()
-                self.sock.sendto(packet.encode(), (TARGET_IP, GATEWAY_PORT))
+                payload = packet.encode()
+                if self.mac_key is not None:
+                    payload = sign(self.mac_key, payload)
+                self.sock.sendto(payload, (TARGET_IP, GATEWAY_PORT))
 
                 data = json.loads(packet)
                 print(f"[{data['timestamp']}] {self.sensor_type} (ID:{self.sensor_id}): {data['value']}")
@@ -61,22 +97,15 @@ class MedicalSensor:
 
 
 class SensorNetwork:
-    def __init__(self):
+    def __init__(self, source=None):
         self.sensors = []
         self.threads = []
+        self.source = source
 
     def create_sensors(self):
         """Create all 5 medical sensors"""
-        sensor_configs = [
-            ('S1', 'FHR'),
-            ('S2', 'TOCO'),
-            ('S3', 'SpO2'),
-            ('S4', 'RespRate'),
-            ('S5', 'Temp')
-        ]
-
-        for sensor_id, sensor_type in sensor_configs:
-            sensor = MedicalSensor(sensor_id, sensor_type)
+        for sensor_id, sensor_type in SENSOR_CONFIGS:
+            sensor = MedicalSensor(sensor_id, sensor_type, self.source)
             self.sensors.append(sensor)
 
         print("=" * 70)
@@ -86,6 +115,8 @@ class SensorNetwork:
         print(f"  • Total Sensors: 5")
         print(f"  • Target Gateway: {TARGET_IP}:{GATEWAY_PORT}")
         print(f"  • Send Interval: {SENSOR_SEND_INTERVAL}s")
+        if self.source is not None:
+            print(f"  • Values: replayed from {self.source.path} ({self.source.rows} rows)")
         print(f"\nSensor Details:")
         for sensor in self.sensors:
             print(f"  [{sensor.sensor_id}] {sensor.sensor_type:10} | Range: {sensor.min_val}-{sensor.max_val}")
@@ -110,8 +141,246 @@ class SensorNetwork:
         print("✓ All sensors stopped")
 
 
-if __name__ == "__main__":
-    network = SensorNetwork()
+# ======================================================
+# LOAD GENERATOR — VIRTUAL DEVICES
+# ======================================================
+class VirtualDeviceLoad:
+    """
+    Simulates n_devices × 5 sensors from one thread: one non-blocking UDP
+    socket, and a heap of (next send time, stream) on the monotonic clock.
+    Each send schedules the stream's next one from its *scheduled* time,
+    so timing does not drift with processing delay.
+
+    Profiles scale every stream's rate over time:
+      steady — constant rate
+      burst  — rate × burst_factor for burst_len s of every burst_period s
+      ramp   — rate grows linearly from 10% to 100% over ramp_time s
+
+    With a DatasetSource, values are replayed from the shared dataset at
+    a per-device row offset instead of drawn at random.
+    """
+
+    def __init__(self, n_devices, rate=1.0 / SENSOR_SEND_INTERVAL, jitter=0.1,
+                 profile="steady", burst_factor=5.0, burst_period=10.0,
+                 burst_len=2.0, ramp_time=60.0, target=(TARGET_IP, GATEWAY_PORT),
+                 source=None):
+        self.source = source
+        self.rate = rate
+        self.jitter = jitter
+        self.profile = profile
+        self.burst_factor = burst_factor
+        self.burst_period = burst_period
+        self.burst_len = burst_len
+        self.ramp_time = ramp_time
+        self.target = target
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        keys = load_keystore() if SIGN_PACKETS else {}
+        boot = int(time.time())
+
+        self.prefix = []
+        self.ranges = []
+        self.types = []
+        self.offsets = []
+        self.keys = []
+        for d in range(n_devices):
+            device_id = f"D{d:05d}"
+            offset = source.offset(device_id) if source is not None else 0
+            for sensor_id, sensor_type in SENSOR_CONFIGS:
+                self.prefix.append(
+                    f'{{"device_id": "{device_id}", "sensor_id": "{sensor_id}", '
+                    f'"sensor_type": "{sensor_type}", "boot": {boot}, '
+                )
+                self.ranges.append(SENSOR_RANGES[sensor_type])
+                self.types.append(sensor_type)
+                self.offsets.append(offset)
+                self.keys.append(keys.get(f"{device_id}/{sensor_id}"))
+        self.seq = [0] * len(self.prefix)
+
+        self.sent = 0
+        self.send_errors = 0
+        self.max_lag = 0.0
+        self.lag_total = 0.0
+
+    def multiplier(self, elapsed):
+        if self.profile == "burst":
+            in_burst = (elapsed % self.burst_period) < self.burst_len
+            return self.burst_factor if in_burst else 1.0
+        if self.profile == "ramp":
+            return 0.1 + 0.9 * min(1.0, elapsed / self.ramp_time)
+        return 1.0
+
+    def target_pps(self, elapsed):
+        return len(self.prefix) * self.rate * self.multiplier(elapsed)
+
+    def value(self, i):
+        if self.source is not None:
+            return self.source.value(self.types[i], self.offsets[i], self.seq[i])
+        lo, hi = self.ranges[i]
+        return normal_value(lo, hi)
+
+    def send(self, i):
+        payload = (
+            f'{self.prefix[i]}"ts_ms": {int(time.time() * 1000)}, '
+            f'"seq": {self.seq[i]}, "value": {self.value(i)}}}'
+        ).encode()
+        self.seq[i] += 1
+        if self.keys[i] is not None:
+            payload = sign(self.keys[i], payload)
+        try:
+            self.sock.sendto(payload, self.target)
+            self.sent += 1
+        except (BlockingIOError, InterruptedError):
+            self.send_errors += 1
+
+    def run(self, duration=None):
+        n = len(self.prefix)
+        interval = 1.0 / self.rate
+        start = time.monotonic()
+        # Stagger first sends across one interval to avoid a thundering herd
+        heap = [(start + interval * i / n, i) for i in range(n)]
+        heapq.heapify(heap)
+
+        print("=" * 70)
+        print("         VIRTUAL DEVICE LOAD GENERATOR")
+        print("=" * 70)
+        print(f"  • Streams: {n // len(SENSOR_CONFIGS)} devices × {len(SENSOR_CONFIGS)} sensors = {n}")
+        print(f"  • Target Gateway: {self.target[0]}:{self.target[1]}")
+        print(f"  • Per-sensor rate: {self.rate} pps | jitter ±{self.jitter:.0%} | profile: {self.profile}")
+        if self.source is not None:
+            print(f"  • Values: replayed from {self.source.path} ({self.source.rows} rows)")
+        print("=" * 70)
+
+        next_report = start + LOAD_REPORT_INTERVAL
+        last_sent = 0
+        target_sent = 0.0
+        last_t = start
+        totals_target = 0.0
+        try:
+            while True:
+                now = time.monotonic()
+                elapsed = now - start
+                if duration is not None and elapsed >= duration:
+                    break
+
+                budget = 10000
+                while heap and heap[0][0] <= now and budget:
+                    t, i = heap[0]
+                    self.send(i)
+                    lag = now - t
+                    self.lag_total += lag
+                    if lag > self.max_lag:
+                        self.max_lag = lag
+                    step = interval / self.multiplier(t - start)
+                    if self.jitter:
+                        step *= 1.0 + random.uniform(-self.jitter, self.jitter)
+                    heapq.heapreplace(heap, (t + step, i))
+                    budget -= 1
+
+                target_sent += self.target_pps(elapsed) * (now - last_t)
+                last_t = now
+
+                if now >= next_report:
+                    span = now - next_report + LOAD_REPORT_INTERVAL
+                    print(
+                        f"📈 t={elapsed:6.1f}s | target {target_sent / span:9.0f} pps | "
+                        f"achieved {(self.sent - last_sent) / span:9.0f} pps | "
+                        f"max lag {self.max_lag * 1000:6.1f} ms | send errors {self.send_errors}"
+                    )
+                    totals_target += target_sent
+                    target_sent = 0.0
+                    last_sent = self.sent
+                    next_report = now + LOAD_REPORT_INTERVAL
+
+                wait = heap[0][0] - time.monotonic()
+                if wait > 0:
+                    time.sleep(min(wait, LOAD_MAX_SLEEP))
+        except KeyboardInterrupt:
+            pass
+
+        elapsed = time.monotonic() - start
+        totals_target += target_sent
+        print("\n" + "=" * 70)
+        print(f"Sent {self.sent} packets in {elapsed:.1f}s")
+        print(f"  • Target   : {totals_target / elapsed:.0f} pps")
+        print(f"  • Achieved : {self.sent / elapsed:.0f} pps "
+              f"({self.sent / max(totals_target, 1):.1%} of target)")
+        print(f"  • Schedule lag: mean {self.lag_total / max(self.sent, 1) * 1000:.2f} ms, "
+              f"max {self.max_lag * 1000:.1f} ms | send errors: {self.send_errors}")
+        print("=" * 70)
+        self.sock.close()
+        return {
+            "streams": n,
+            "elapsed": round(elapsed, 3),
+            "sent": self.sent,
+            "target_pps": round(totals_target / elapsed, 1),
+            "achieved_pps": round(self.sent / elapsed, 1),
+            "send_errors": self.send_errors,
+            "mean_lag_ms": round(self.lag_total / max(self.sent, 1) * 1000, 3),
+            "max_lag_ms": round(self.max_lag * 1000, 3),
+        }
+
+
+def run_load(argv):
+    parser = argparse.ArgumentParser(
+        prog="sensor_node.py load", description="Simulate many virtual devices from one process"
+    )
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument("--rate", type=float, default=1.0 / SENSOR_SEND_INTERVAL,
+                        help="packets per second per sensor")
+    parser.add_argument("--jitter", type=float, default=0.1, help="±fraction of the interval")
+    parser.add_argument("--profile", choices=["steady", "burst", "ramp"], default="steady")
+    parser.add_argument("--burst-factor", type=float, default=5.0)
+    parser.add_argument("--burst-period", type=float, default=10.0)
+    parser.add_argument("--burst-len", type=float, default=2.0)
+    parser.add_argument("--ramp-time", type=float, default=60.0)
+    parser.add_argument("--duration", type=float, default=None, help="seconds (default: until Ctrl+C)")
+    parser.add_argument("--json", action="store_true", help="print the final summary as JSON")
+    add_data_argument(parser)
+    args = parser.parse_args(argv)
+    if args.devices < 1:
+        parser.error("--devices must be at least 1")
+    if args.rate <= 0:
+        parser.error("--rate must be positive")
+
+    summary = VirtualDeviceLoad(
+        args.devices, rate=args.rate, jitter=args.jitter, profile=args.profile,
+        burst_factor=args.burst_factor, burst_period=args.burst_period,
+        burst_len=args.burst_len, ramp_time=args.ramp_time,
+        source=dataset_source(args.data, args.fit_ranges)
+    ).run(args.duration)
+    if args.json:
+        print(json.dumps(summary))
+
+
+def add_data_argument(parser):
+    parser.add_argument(
+        "--data", nargs="?", const="", default=None, metavar="PATH",
+        help="replay values from a processed CSV/.npy (default: final_5sensor.csv)"
+    )
+    parser.add_argument(
+        "--fit-ranges", action="store_true",
+        help="rescale replayed columns into SENSOR_RANGES (moves them off the LSTM's training scale)"
+    )
+
+
+def dataset_source(path, fit_ranges=False):
+    """DatasetSource for --data, or None (numpy is only needed for replay)"""
+    if path is None:
+        return None
+    from sensor_replay import DatasetSource, DEFAULT_DATASET
+    return DatasetSource(path or DEFAULT_DATASET, fit_ranges=fit_ranges)
+
+
+if __name__ == "__main__" and sys.argv[1:2] == ["load"]:
+    run_load(sys.argv[2:])
+
+elif __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Medical sensor network (5 sensors)")
+    add_data_argument(parser)
+    args = parser.parse_args()
+    network = SensorNetwork(dataset_source(args.data, args.fit_ranges))
 
     try:
         network.start_all()
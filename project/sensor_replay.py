@@ -0,0 +1,129 @@
+"""
+DATA-DRIVEN SENSOR STREAMS
+Replays rows of a processed 5-sensor dataset (final_5sensor.csv or an
+N×5 .npy in S1..S5 order) instead of drawing uniform random values, so
+the collector's LSTM sees the dynamics it was trained on.
+
+The dataset is memory-mapped once and shared by every sensor / virtual
+device; each device starts at its own row offset and walks forward one
+row per packet, wrapping at the end.
+
+The processed recordings do not all sit inside the collector's rule
+ranges (config.SENSOR_RANGES): VitalDB temperature reads about 25 °C,
+respiratory rate spans 4–27, and FHR has 0-valued dropouts. Replayed
+as-is they trip security_violation on normal traffic. fit_to_ranges can
+move them into the ranges, but it is opt-in: the collector's scaler was
+fitted on the original values, so rescaled Temp / RespRate would be out
+of distribution for the LSTM.
+"""
+
+import os
+import zlib
+import numpy as np
+
+from config import SENSOR_RANGES
+
+# ======================================================
+# CONFIG
+# ======================================================
+DEFAULT_DATASET = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "medical_iot_ids", "processed", "final_5sensor.csv"
+))
+SENSOR_COLUMNS = ["FHR", "TOCO", "SpO2", "RespRate", "Temp"]   # S1..S5
+DROPOUT_COLUMNS = ["FHR", "SpO2", "RespRate", "Temp"]          # 0 = no reading
+RANGE_MARGIN = 0.05      # fraction of a range left free at each end when rescaling
+
+
+def npy_cache_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".f32.npy"
+
+
+def load_dataset(path=DEFAULT_DATASET):
+    """
+    Memory-map a processed dataset as a read-only float32 (rows, 5) array.
+    A CSV is parsed once into a .f32.npy beside it (rebuilt when the CSV
+    is newer) so later runs and processes only map pages in.
+    """
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+
+    cache = npy_cache_path(path)
+    if not os.path.exists(cache) or os.path.getmtime(cache) < os.path.getmtime(path):
+        with open(path) as f:
+            header = f.readline().strip().split(",")
+        cols = [header.index(name) for name in SENSOR_COLUMNS]
+        data = np.loadtxt(path, delimiter=",", skiprows=1, usecols=cols, dtype=np.float32, ndmin=2)
+        np.save(cache, data)
+        print(f"✓ Cached {data.shape[0]} rows of {os.path.basename(path)} → {cache}")
+    return np.load(cache, mmap_mode="r")
+
+
+def fill_dropouts(col):
+    """Hold each 0 / NaN dropout at the last valid reading (the first valid one at the start)"""
+    valid = np.isfinite(col) & (col != 0)
+    if valid.all() or not valid.any():
+        return col
+    idx = np.where(valid, np.arange(len(col)), 0)
+    np.maximum.accumulate(idx, out=idx)
+    out = col[idx]
+    out[:np.argmax(valid)] = col[np.argmax(valid)]
+    return out
+
+
+def fit_to_ranges(data, ranges=SENSOR_RANGES):
+    """
+    Copy of `data` whose normal rows pass the collector's range rules:
+    dropouts are filled, and a column whose 1st–99th percentile leaves
+    its range is mapped linearly onto the range (less RANGE_MARGIN) and
+    clipped, which keeps its dynamics. Returns (data, rescaled columns).
+    """
+    data = np.array(data, dtype=np.float32)
+    rescaled = []
+    for i, name in enumerate(SENSOR_COLUMNS):
+        col = data[:, i]
+        if name in DROPOUT_COLUMNS:
+            col = fill_dropouts(col)
+        lo, hi = ranges[name]
+        p1, p99 = np.percentile(col, [1, 99])
+        if p1 < lo or p99 > hi:
+            margin = RANGE_MARGIN * (hi - lo)
+            span = max(p99 - p1, 1e-6)
+            col = lo + margin + (col - p1) * (hi - lo - 2 * margin) / span
+            col = np.clip(col, lo, hi)
+            rescaled.append(name)
+        data[:, i] = col
+    return data, rescaled
+
+
+# ======================================================
+# SHARED REPLAY SOURCE
+# ======================================================
+class DatasetSource:
+    """
+    One mapped dataset shared by many streams. A stream reads
+    row (offset + seq) % rows of its sensor's column; offsets are spread
+    by device so virtual devices do not all replay the same moment.
+
+    By default the mapped rows are replayed exactly as the model saw them
+    in training. fit_ranges=True fits them to SENSOR_RANGES in a private
+    copy, for rule-only runs where the LSTM score does not matter.
+    """
+
+    def __init__(self, path=DEFAULT_DATASET, fit_ranges=False):
+        self.path = path
+        self.data = load_dataset(path)
+        if fit_ranges:
+            self.data, rescaled = fit_to_ranges(self.data)
+            if rescaled:
+                print(f"✓ Replay rescaled into sensor ranges: {', '.join(rescaled)}")
+        self.rows = self.data.shape[0]
+        self.column = {name: i for i, name in enumerate(SENSOR_COLUMNS)}
+
+    def offset(self, device_id=None):
+        if device_id is None:
+            return 0
+        return zlib.crc32(device_id.encode()) % self.rows
+
+    def value(self, sensor_type, offset, seq):
+        return round(float(self.data[(offset + seq) % self.rows, self.column[sensor_type]]), 2)
@@ -0,0 +1,284 @@
+import time
+import heapq
+from array import array
+from collections import OrderedDict
+
+# ======================================================
+# CONFIG
+# ======================================================
+SEQ_WINDOW = 64            # bits of history kept per sensor
+MAX_TRACKED = 4096         # sensor streams tracked; the least recently seen is evicted
+SEQ_MAX = (1 << 63) - 1    # sequence numbers are stored as int64
+JITTER_DEPTH = 8           # packets held back waiting for a gap to fill
+JITTER_MAX_DELAY = 0.2     # seconds a held packet may wait
+
+NEW, REORDERED, DUPLICATE, LATE, RESTART = "new", "reordered", "duplicate", "late", "restart"
+INVALID = "invalid"
+
+
+def stream_key(packet):
+    """
+    Sequence numbers are per sensor of a device, and restart from 0 each
+    time the sender boots (packets carry the boot time as "boot")
+    """
+    key = packet.get("sensor_id", "")
+    device = packet.get("device_id")
+    if device is not None:
+        key = f"{device}/{key}"
+    boot = packet.get("boot")
+    if boot is not None:
+        key = f"{key}#{boot}"
+    return key
+
+
+# ======================================================
+# LOSS / REORDER ACCOUNTING
+# ======================================================
+class SequenceTracker:
+    """
+    Per-stream sequence accounting in flat arrays: highest sequence seen,
+    a `window`-bit bitmap of which recent sequence numbers arrived, and
+    counters for received / duplicate / reordered / late packets and the
+    deepest reorder seen. Each observe() is O(1).
+
+    Anything older than the bitmap is counted as "late" (it cannot be told
+    apart from a duplicate). With allow_restart, a small sequence far below
+    the highest one is taken as a sender restart and resets the stream;
+    anti-replay users turn that off and rely on the "boot" field instead,
+    since a replayed low sequence number looks exactly like a restart.
+
+    A stream's newer boot evicts its older one, and packets of a boot
+    older than the newest seen are "late". Past max_tracked streams the
+    least recently seen stream is evicted (and counted). Sequence numbers
+    outside 0..SEQ_MAX are "invalid" and never stored.
+    """
+
+    COUNTERS = ("received", "duplicates", "reordered", "late", "gap_events",
+                "max_reorder_depth", "restarts")
+
+    def __init__(self, window=SEQ_WINDOW, max_tracked=MAX_TRACKED, allow_restart=True):
+        self.window = window
+        self.allow_restart = allow_restart
+        self.mask = (1 << window) - 1
+        self.max_tracked = max_tracked
+
+        self.slots = OrderedDict()          # key → slot, least recently seen first
+        self.free = []                      # slots of evicted streams
+        self.boots = {}                     # stream key without boot → newest boot
+        self.first = array("q")
+        self.highest = array("q")
+        self.expected_before = array("q")   # expected count before restarts
+        self.bitmap = []
+        self.counters = {name: array("q") for name in self.COUNTERS}
+        self.evicted = 0
+        self.stale_boots = 0
+        self.invalid = 0
+        self.retired = {name: 0 for name in self.COUNTERS + ("lost",)}
+
+    def _retire(self, key, slot):
+        """Fold an evicted stream into the retired totals and free its slot"""
+        for name, value in self.stream_stats(key, slot).items():
+            if name == "max_reorder_depth":
+                self.retired[name] = max(self.retired[name], value)
+            else:
+                self.retired[name] += value
+        self.free.append(slot)
+
+    def _evict(self, key):
+        slot = self.slots.pop(key, None)
+        if slot is not None:
+            self._retire(key, slot)
+
+    def _new_slot(self, key, seq):
+        if len(self.slots) >= self.max_tracked:
+            old_key, slot = self.slots.popitem(last=False)
+            base, sep, _ = old_key.rpartition("#")
+            if sep:
+                self.boots.pop(base, None)
+            self._retire(old_key, slot)
+            self.evicted += 1
+
+        if self.free:
+            slot = self.free.pop()
+            self.first[slot] = seq
+            self.highest[slot] = seq
+            self.expected_before[slot] = 0
+            self.bitmap[slot] = 1
+            for c in self.counters.values():
+                c[slot] = 0
+        else:
+            slot = len(self.highest)
+            self.first.append(seq)
+            self.highest.append(seq)
+            self.expected_before.append(0)
+            self.bitmap.append(1)
+            for c in self.counters.values():
+                c.append(0)
+        self.slots[key] = slot
+        self.counters["received"][slot] = 1
+        return slot
+
+    def _check_boot(self, key):
+        """False for a boot older than the stream's newest; evicts the older boot"""
+        base, sep, boot = key.rpartition("#")
+        if not sep or not boot.isdigit():
+            return True
+        boot = int(boot)
+        newest = self.boots.get(base)
+        if newest is not None:
+            if boot < newest:
+                return False
+            self._evict(f"{base}#{newest}")
+        self.boots[base] = boot
+        return True
+
+    def observe(self, key, seq):
+        """Classify one sequence number and update the stream's counters"""
+        if not 0 <= seq <= SEQ_MAX:
+            self.invalid += 1
+            return INVALID
+
+        slot = self.slots.get(key)
+        if slot is None:
+            if not self._check_boot(key):
+                self.stale_boots += 1
+                return LATE
+            self._new_slot(key, seq)
+            return NEW
+        self.slots.move_to_end(key)
+
+        c = self.counters
+        d = seq - self.highest[slot]
+
+        if d > 0:
+            # A jump past the window leaves nothing of the old bitmap
+            self.bitmap[slot] = ((self.bitmap[slot] << d) | 1) & self.mask if d < self.window else 1
+            self.highest[slot] = seq
+            c["received"][slot] += 1
+            if d > 1:
+                c["gap_events"][slot] += 1
+            return NEW
+
+        d = -d
+        if d >= self.window:
+            if self.allow_restart and seq < self.window:
+                # Sender restarted its counter
+                self.expected_before[slot] += self.highest[slot] - self.first[slot] + 1
+                self.first[slot] = seq
+                self.highest[slot] = seq
+                self.bitmap[slot] = 1
+                c["restarts"][slot] += 1
+                c["received"][slot] += 1
+                return RESTART
+            c["late"][slot] += 1
+            return LATE
+
+        bit = 1 << d
+        if self.bitmap[slot] & bit:
+            c["duplicates"][slot] += 1
+            return DUPLICATE
+
+        self.bitmap[slot] |= bit
+        c["received"][slot] += 1
+        c["reordered"][slot] += 1
+        if d > c["max_reorder_depth"][slot]:
+            c["max_reorder_depth"][slot] = d
+        return REORDERED
+
+    def stream_stats(self, key, slot=None):
+        if slot is None:
+            slot = self.slots[key]
+        stats = {name: self.counters[name][slot] for name in self.COUNTERS}
+        expected = self.expected_before[slot] + self.highest[slot] - self.first[slot] + 1
+        stats["lost"] = max(0, expected - stats["received"] - stats["late"])
+        return stats
+
+    def export(self):
+        """Per-stream stats for every tracked stream"""
+        return {key: self.stream_stats(key) for key in list(self.slots)}
+
+    def totals(self):
+        """Stats summed over all streams, evicted ones included (max for the reorder depth)"""
+        streams = self.export().values()
+        total = dict(self.retired)
+        for stats in streams:
+            for name, value in stats.items():
+                if name == "max_reorder_depth":
+                    total[name] = max(total[name], value)
+                else:
+                    total[name] += value
+        total["streams"] = len(self.slots)
+        total["evicted"] = self.evicted
+        total["stale_boots"] = self.stale_boots
+        total["invalid"] = self.invalid
+        return total
+
+
+# ======================================================
+# JITTER BUFFER
+# ======================================================
+class JitterBuffer:
+    """
+    Releases each stream's packets in sequence order. A packet that
+    arrives ahead of a gap is held until the gap fills, `depth` packets
+    are waiting, or it has waited `max_delay` seconds; then the gap is
+    given up as lost.
+    """
+
+    def __init__(self, depth=JITTER_DEPTH, max_delay=JITTER_MAX_DELAY):
+        self.depth = depth
+        self.max_delay = max_delay
+        self.next_seq = {}
+        self.held = {}          # key → heap of (seq, arrival, n, packet)
+        self.released_late = 0
+        self._n = 0
+
+    def _drain(self, key, heap, force=False):
+        out = []
+        nxt = self.next_seq[key]
+        while heap and (force or heap[0][0] <= nxt):
+            seq, _, _, pkt = heapq.heappop(heap)
+            force = False
+            if seq < nxt:
+                continue        # duplicate of something already released
+            out.append(pkt)
+            nxt = seq + 1
+        self.next_seq[key] = nxt
+        return out
+
+    def push(self, key, seq, packet, now=None):
+        """Add one packet; return the packets now releasable, in order"""
+        if now is None:
+            now = time.monotonic()
+        nxt = self.next_seq.get(key)
+        if nxt is None or seq == nxt:
+            self.next_seq[key] = seq + 1
+            heap = self.held.get(key)
+            return [packet] + (self._drain(key, heap) if heap else [])
+        if seq < nxt:
+            if seq == 0:
+                # Sender restarted: flush what is held and start over
+                heap = self.held.pop(key, [])
+                out = [entry[3] for entry in sorted(heap)]
+                self.next_seq[key] = 1
+                return out + [packet]
+            self.released_late += 1
+            return [packet]     # too late to reorder; pass it through
+
+        heap = self.held.setdefault(key, [])
+        self._n += 1
+        heapq.heappush(heap, (seq, now, self._n, packet))
+        out = []
+        while len(heap) > self.depth:
+            out.extend(self._drain(key, heap, force=True))
+        return out
+
+    def expired(self, now=None):
+        """Release streams whose oldest held packet waited too long"""
+        if now is None:
+            now = time.monotonic()
+        out = []
+        for key, heap in self.held.items():
+            while heap and min(entry[1] for entry in heap) + self.max_delay <= now:
+                out.extend(self._drain(key, heap, force=True))
+        return out
@@ -0,0 +1,99 @@
+"""
+Regression checks for gateway packet authentication: the MAC key must be
+chosen from the identity the collector will decode, not from whatever a
+regex finds first in the raw bytes. Also checks that one bad datagram
+only costs itself in a passthrough burst.
+
+Run:  python -m pytest project/test_gateway_auth.py   (or python test_gateway_auth.py)
+"""
+
+import os
+import json
+from collections import Counter
+
+from gateway import NetworkGateway, extract_header
+from seq_tracker import SequenceTracker
+from keystore import MacVerifier, sign, MAC_LEN
+
+# Second copies of sensor_id / device_id with "_" written as the JSON escape \u005f:
+# json.loads reads S9 on D7, a plain regex would read S1 on D1
+ESCAPED_KEYS_BODY = (
+    b'{"sensor_id":"S1","sensor\\u005fid":"S9",'
+    b'"device_id":"D1","device\\u005fid":"D7",'
+    b'"sensor_type":"FHR","value":140.0,"ts_ms":1,"seq":1,"boot":1}'
+)
+
+
+class CountingLog:
+    def __init__(self):
+        self.blocked = Counter()
+
+    def count_blocked(self, reason, n=1):
+        self.blocked[reason] += n
+
+    def allow_line(self):
+        return False
+
+
+def make_gateway(keys=None):
+    gw = NetworkGateway.__new__(NetworkGateway)   # no sockets needed
+    gw.auth = MacVerifier(keys) if keys is not None else None
+    gw.log = CountingLog()
+    gw.n_workers = 1
+    gw.anti_replay = False
+    gw.seq_tracker = SequenceTracker()
+    gw.timestamp_counts = Counter()
+    gw.valid_devices = set()
+    return gw
+
+
+def test_header_matches_collector_decode():
+    packet = json.loads(ESCAPED_KEYS_BODY)
+    header = extract_header(memoryview(ESCAPED_KEYS_BODY))
+    assert header["sensor_id"] == packet["sensor_id"] == "S9"
+    assert header["device_id"] == packet["device_id"] == "D7"
+
+
+def test_escaped_keys_cannot_borrow_another_sensors_key():
+    keys = {"D1/S1": os.urandom(32), "D7/S9": os.urandom(32)}
+    gw = make_gateway(keys)
+    forged = sign(keys["D1/S1"], ESCAPED_KEYS_BODY)
+    assert gw.authenticate(memoryview(forged)) == (None, None)
+    assert gw.log.blocked["Bad MAC"] == 1
+
+    # The real owner of D7/S9 still verifies
+    body, header = gw.authenticate(memoryview(sign(keys["D7/S9"], ESCAPED_KEYS_BODY)))
+    assert body is not None and header["sensor_id"] == "S9"
+
+
+def test_nested_fields_are_not_top_level():
+    assert extract_header(b'{"gt":{"sensor_id":"S9"},"sensor_id":"S1"}')["sensor_id"] == "S1"
+    assert extract_header(b'{"gt":{"sensor_id":"S9"}}') is None
+
+
+def test_handoff_datagrams_are_verified_again():
+    keys = {"D1/S1": os.urandom(32)}
+    body = b'{"sensor_id":"S1","device_id":"D1","ts_ms":1}'
+    for process in ("process_batch_passthrough", "process_batch"):
+        gw = make_gateway(keys)
+        # Anything on the host can reach the loopback handoff port
+        out = getattr(gw, process)([body + bytes(MAC_LEN), sign(keys["D1/S1"], body)], owned=True)
+        assert len(out) == 1 and gw.log.blocked["Bad MAC"] == 1
+
+
+def test_bad_datagram_does_not_drop_the_burst():
+    gw = make_gateway()
+    good = b'{"sensor_id":"S1","ts_ms":1,"seq":%d}'
+    # Too many digits for int(): raises inside header extraction
+    huge_seq = b'{"sensor_id":"S1","seq":' + b"9" * 5000 + b"}"
+    batch = [memoryview(good % 1), memoryview(huge_seq), memoryview(good % 2)]
+    out = gw.process_batch_passthrough(batch)
+    assert [bytes(view) for view, _ in out] == [good % 1, good % 2]
+    assert gw.log.blocked["Malformed"] == 1
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")